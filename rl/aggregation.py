@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import csv
 import json
+import math
 import os
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple
+from functools import partial
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
 
 from .config import Settings
-from .metrics import readability_metrics
-from .utils import ensure_parent_dir, iso_date, write_csv
+from .metrics import METRICS_VERSION
+from .metrics_cache import MetricsCache, cached_readability_metrics_batch
+from .utils import ensure_parent_dir, iso_date, write_csv_rows
+
+# Optional dependency
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+# articles per worker task in compute_per_article
+_CHUNK_SIZE = 64
+# path -> [mtime_ns, size, source, url] of the inputs behind per_article.csv
+_INDEX_NAME = ".index.json"
 
 
-@dataclass
+@dataclass(slots=True)
 class ArticleRow:
     source: str
     url: str
@@ -28,160 +45,264 @@ class ArticleRow:
     flesch_reading_ease: Optional[float]
 
 
-def _iter_extracted_json(cfg: Settings, source: str) -> Iterable[Dict[str, object]]:
+def _scan_json_files(directory: str) -> Iterable[str]:
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_json_files(entry.path)
+            elif entry.name.endswith(".json"):
+                yield entry.path
+
+
+def _iter_extracted_paths(cfg: Settings, source: str) -> Iterable[str]:
     base = os.path.join(cfg.extracted_dir, source)
     if not os.path.exists(base):
         return
-    for root, _, files in os.walk(base):
-        for fn in files:
-            if not fn.endswith(".json"):
-                continue
-            path = os.path.join(root, fn)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                yield data
-            except Exception:
-                continue
+    yield from _scan_json_files(base)
+
+
+def _read_extracted_json(path: str) -> Optional[Dict[str, object]]:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except Exception:
+        return None
+
+
+def _opt_float(v: float) -> Optional[float]:
+    return None if math.isnan(v) else float(v)
 
 
-def compute_per_article(cfg: Settings) -> List[ArticleRow]:
-    rows: List[ArticleRow] = []
-    for source in ("magazine", "web"):
-        for data in _iter_extracted_json(cfg, source):
-            text = str(data.get("text", ""))
-            m = readability_metrics(text)
-            rows.append(
-                ArticleRow(
-                    source=source,
-                    url=str(data.get("url")),
-                    title=(data.get("title") or None),
-                    author=(data.get("author") or None),
-                    section=(data.get("section") or None),
-                    published=(data.get("published") or None),
-                    issue_date=(data.get("issue_date") or None),
-                    num_words=int(m.get("num_words") or 0),
-                    num_sentences=int(m.get("num_sentences") or 0),
-                    gunning_fog=(m.get("gunning_fog") if m.get("gunning_fog") is not None else None),
-                    dale_chall=(m.get("dale_chall") if m.get("dale_chall") is not None else None),
-                    flesch_reading_ease=(m.get("flesch_reading_ease") if m.get("flesch_reading_ease") is not None else None),
-                )
-            )
+def _compute_rows(items: List[Tuple[str, str]], cache_path: Optional[str] = None) -> List[Tuple[str, ArticleRow]]:
+    # Worker entry point: reads a chunk of (source, path) pairs and scores them in one batch.
+    # Returns (path, row) pairs in input order; unreadable files are dropped.
+    loaded: List[Tuple[str, str, Dict[str, object]]] = []
+    for source, path in items:
+        data = _read_extracted_json(path)
+        if data is not None:
+            loaded.append((source, path, data))
+
+    m = cached_readability_metrics_batch([str(data.get("text", "")) for _, _, data in loaded], cache_path)
+    rows: List[Tuple[str, ArticleRow]] = []
+    for i, (source, path, data) in enumerate(loaded):
+        rows.append((
+            path,
+            ArticleRow(
+                source=source,
+                url=str(data.get("url")),
+                title=(data.get("title") or None),
+                author=(data.get("author") or None),
+                section=(data.get("section") or None),
+                published=(data.get("published") or None),
+                issue_date=(data.get("issue_date") or None),
+                num_words=int(m["num_words"][i]),
+                num_sentences=int(m["num_sentences"][i]),
+                gunning_fog=_opt_float(m["gunning_fog"][i]),
+                dale_chall=_opt_float(m["dale_chall"][i]),
+                flesch_reading_ease=_opt_float(m["flesch_reading_ease"][i]),
+            ),
+        ))
     return rows
 
 
-def write_per_article_csv(cfg: Settings, rows: List[ArticleRow]) -> str:
+def _extracted_items(cfg: Settings) -> List[Tuple[str, str]]:
+    return [(source, path) for source in ("magazine", "web") for path in _iter_extracted_paths(cfg, source)]
+
+
+def _iter_computed(cfg: Settings, items: List[Tuple[str, str]], jobs: int, force: bool) -> Iterator[Tuple[str, ArticleRow]]:
+    if force and cfg.metrics_cache_path:
+        with MetricsCache(cfg.metrics_cache_path) as cache:
+            cache.clear()
+    chunks = [items[i:i + _CHUNK_SIZE] for i in range(0, len(items), _CHUNK_SIZE)]
+    compute = partial(_compute_rows, cache_path=cfg.metrics_cache_path)
+    if jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            for part in ex.map(compute, chunks):
+                yield from part
+    else:
+        for c in chunks:
+            yield from compute(c)
+
+
+_FIELDNAMES = [
+    "source",
+    "url",
+    "title",
+    "author",
+    "section",
+    "published",
+    "issue_date",
+    "num_words",
+    "num_sentences",
+    "gunning_fog",
+    "dale_chall",
+    "flesch_reading_ease",
+]
+
+
+def write_per_article_csv(cfg: Settings, rows: Iterable[ArticleRow]) -> str:
     out = os.path.join(cfg.metrics_dir, "per_article.csv")
-    fieldnames = [
-        "source",
-        "url",
-        "title",
-        "author",
-        "section",
-        "published",
-        "issue_date",
-        "num_words",
-        "num_sentences",
-        "gunning_fog",
-        "dale_chall",
-        "flesch_reading_ease",
-    ]
-    write_csv(out, (r.__dict__ for r in rows), fieldnames)
+    write_csv_rows(out, map(attrgetter(*_FIELDNAMES), rows), _FIELDNAMES)
     return out
 
 
-def _mean(values: List[float]) -> Optional[float]:
-    vals = [v for v in values if v is not None]
-    if not vals:
-        return None
-    return sum(vals) / len(vals)
+def _row_from_csv(d: Dict[str, str]) -> ArticleRow:
+    def opt(v: str) -> Optional[float]:
+        return float(v) if v else None
 
+    return ArticleRow(
+        source=d["source"],
+        url=d["url"],
+        title=d["title"] or None,
+        author=d["author"] or None,
+        section=d["section"] or None,
+        published=d["published"] or None,
+        issue_date=d["issue_date"] or None,
+        num_words=int(d["num_words"]),
+        num_sentences=int(d["num_sentences"]),
+        gunning_fog=opt(d["gunning_fog"]),
+        dale_chall=opt(d["dale_chall"]),
+        flesch_reading_ease=opt(d["flesch_reading_ease"]),
+    )
 
-def _weighted_mean(values: List[Tuple[Optional[float], int]]) -> Optional[float]:
-    num = 0.0
-    den = 0
-    for val, w in values:
-        if val is None or w <= 0:
-            continue
-        num += val * w
-        den += w
-    if den == 0:
-        return None
-    return num / den
+
+def _load_previous(cfg: Settings) -> Tuple[Dict[str, list], Dict[Tuple[str, str], ArticleRow]]:
+    # Index and rows of the last compute_per_article run; empty when missing,
+    # unreadable, malformed, or written by a different metrics implementation.
+    try:
+        with open(os.path.join(cfg.metrics_dir, _INDEX_NAME), "rb") as f:
+            index = json.loads(f.read())
+        if not isinstance(index, dict) or index.get("metrics_version") != METRICS_VERSION:
+            return {}, {}
+        files = index["files"]
+        # [mtime_ns, size, source, url] per path; anything else means a full recompute
+        if not isinstance(files, dict) or not all(
+            isinstance(e, list) and len(e) == 4 and isinstance(e[2], str) and isinstance(e[3], str)
+            for e in files.values()
+        ):
+            return {}, {}
+        rows: Dict[Tuple[str, str], ArticleRow] = {}
+        dupes = set()
+        with open(os.path.join(cfg.metrics_dir, "per_article.csv"), newline="", encoding="utf-8") as f:
+            for d in csv.DictReader(f):
+                row = _row_from_csv(d)
+                key = (row.source, row.url)
+                if key in rows:
+                    dupes.add(key)
+                rows[key] = row
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}, {}
+    # ambiguous URLs cannot be mapped back to a single file
+    for key in dupes:
+        del rows[key]
+    return files, rows
 
 
-def aggregate_per_issue(cfg: Settings, rows: List[ArticleRow]) -> str:
-    # Group by issue_date + source
-    by_issue: Dict[Tuple[str, str], List[ArticleRow]] = defaultdict(list)
-    for r in rows:
-        key_date = r.issue_date or r.published or None
-        if not key_date:
+def compute_per_article(cfg: Settings, jobs: int = 1, force: bool = False) -> str:
+    """Write per_article.csv, only re-reading extracted files whose mtime/size changed since the last run.
+
+    An article saved under more than one filename (e.g. before and after a
+    slugify change) is written once, from its most recently modified file;
+    the older copies are re-read on every run.
+    """
+    prev_files, prev_rows = ({}, {}) if force else _load_previous(cfg)
+    stamps: Dict[str, List[int]] = {}
+    scanned: List[Tuple[str, str]] = []
+    for source, path in _extracted_items(cfg):
+        try:
+            st = os.stat(path)
+        except OSError:
             continue
-        by_issue[(key_date, r.source)].append(r)
-
-    out_rows: List[Dict[str, object]] = []
-    for (issue_date, source), items in sorted(by_issue.items()):
-        g = _mean([r.gunning_fog for r in items])
-        d = _mean([r.dale_chall for r in items])
-        f = _mean([r.flesch_reading_ease for r in items])
-        gw = _weighted_mean([(r.gunning_fog, r.num_words) for r in items])
-        dw = _weighted_mean([(r.dale_chall, r.num_words) for r in items])
-        fw = _weighted_mean([(r.flesch_reading_ease, r.num_words) for r in items])
-        total_words = sum(r.num_words for r in items)
-        out_rows.append({
-            "issue_date": issue_date,
-            "source": source,
-            "num_articles": len(items),
-            "total_words": total_words,
-            "gunning_fog_mean": g,
-            "dale_chall_mean": d,
-            "flesch_reading_ease_mean": f,
-            "gunning_fog_weighted_mean": gw,
-            "dale_chall_weighted_mean": dw,
-            "flesch_reading_ease_weighted_mean": fw,
-        })
+        stamps[path] = [st.st_mtime_ns, st.st_size]
+        scanned.append((source, path))
+    # newest first, so the first copy of a (source, url) is the one kept
+    scanned.sort(key=lambda item: stamps[item[1]][0], reverse=True)
+
+    plan: List[Tuple[str, Optional[ArticleRow]]] = []
+    todo: List[Tuple[str, str]] = []
+    for source, path in scanned:
+        prev = prev_files.get(path)
+        row = prev_rows.get((prev[2], prev[3])) if prev and prev[:2] == stamps[path] else None
+        if row is None:
+            todo.append((source, path))
+        plan.append((path, row))
+
+    files: Dict[str, list] = {}
+    seen: Set[Tuple[str, str]] = set()
+
+    def rows() -> Iterator[ArticleRow]:
+        # merge reused and freshly computed rows back into input order
+        computed = _iter_computed(cfg, todo, jobs, force)
+        pending = next(computed, None)
+        for path, row in plan:
+            if row is None:
+                if pending is None or pending[0] != path:
+                    continue  # unreadable
+                row = pending[1]
+                pending = next(computed, None)
+            key = (row.source, row.url)
+            if key in seen:
+                # not indexed: its row would be the kept copy's, which must not
+                # be reused for this file if the kept copy is deleted later
+                continue
+            seen.add(key)
+            files[path] = [*stamps[path], row.source, row.url]
+            yield row
+
+    out = write_per_article_csv(cfg, rows())
+    # written after the CSV so the index never describes rows that are not on disk
+    index_path = os.path.join(cfg.metrics_dir, _INDEX_NAME)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"metrics_version": METRICS_VERSION, "files": files}, f)
+    os.replace(tmp, index_path)
+    return out
+
+
+_METRIC_COLUMNS = ["gunning_fog", "dale_chall", "flesch_reading_ease"]
+
+
+def aggregate_per_issue(cfg: Settings, per_article_csv_path: str) -> str:
+    df = pd.read_csv(
+        per_article_csv_path,
+        usecols=["source", "published", "issue_date", "num_words", *_METRIC_COLUMNS],
+        dtype={"source": str, "published": str, "issue_date": str},
+    )
+    # Group by issue_date (falling back to published) + source
+    df["issue_date"] = df["issue_date"].fillna(df["published"])
+    df = df.dropna(subset=["issue_date"])
+
+    # Weighted means skip missing values and non-positive word counts
+    for col in _METRIC_COLUMNS:
+        w = df["num_words"].where(df[col].notna() & (df["num_words"] > 0), 0)
+        df[f"{col}_wsum"] = df[col].fillna(0.0) * w
+        df[f"{col}_wden"] = w
+
+    grp = df.groupby(["issue_date", "source"], sort=True)
+    out_df = grp[_METRIC_COLUMNS].mean().add_suffix("_mean")
+    out_df.insert(0, "num_articles", grp.size())
+    out_df.insert(1, "total_words", grp["num_words"].sum())
+    sums = grp[[f"{c}_wsum" for c in _METRIC_COLUMNS] + [f"{c}_wden" for c in _METRIC_COLUMNS]].sum()
+    for col in _METRIC_COLUMNS:
+        den = sums[f"{col}_wden"]
+        out_df[f"{col}_weighted_mean"] = (sums[f"{col}_wsum"] / den).where(den > 0)
 
     out = os.path.join(cfg.metrics_dir, "per_issue.csv")
-    fieldnames = list(out_rows[0].keys()) if out_rows else [
-        "issue_date","source","num_articles","total_words",
-        "gunning_fog_mean","dale_chall_mean","flesch_reading_ease_mean",
-        "gunning_fog_weighted_mean","dale_chall_weighted_mean","flesch_reading_ease_weighted_mean"
-    ]
-    write_csv(out, out_rows, fieldnames)
+    ensure_parent_dir(out)
+    out_df.reset_index().to_csv(out, index=False)
     return out
 
 
 def aggregate_per_year(cfg: Settings, per_issue_csv_path: str) -> str:
-    # Read per_issue CSV
-    import csv
-
-    by_year: Dict[Tuple[int, str], List[Dict[str, float]]] = defaultdict(list)
-    with open(per_issue_csv_path, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            date = datetime.strptime(row["issue_date"], "%Y-%m-%d")
-            year = date.year
-            source = row["source"]
-            by_year[(year, source)].append({
-                "gunning_fog": float(row["gunning_fog_mean"]) if row["gunning_fog_mean"] else None,
-                "dale_chall": float(row["dale_chall_mean"]) if row["dale_chall_mean"] else None,
-                "flesch": float(row["flesch_reading_ease_mean"]) if row["flesch_reading_ease_mean"] else None,
-            })
-
-    out_rows: List[Dict[str, object]] = []
-    for (year, source), items in sorted(by_year.items()):
-        g = _mean([x["gunning_fog"] for x in items])
-        d = _mean([x["dale_chall"] for x in items])
-        f = _mean([x["flesch"] for x in items])
-        out_rows.append({
-            "year": year,
-            "source": source,
-            "gunning_fog_mean": g,
-            "dale_chall_mean": d,
-            "flesch_reading_ease_mean": f,
-        })
+    # ISO dates parse in pandas' C fast path; DatetimeIndex also copes with an
+    # empty (object-typed) column where `.dt` would raise
+    df = pd.read_csv(per_issue_csv_path, parse_dates=["issue_date"], date_format="%Y-%m-%d", dtype={"source": str})
+    df["year"] = pd.DatetimeIndex(df["issue_date"]).year
+    mean_cols = [f"{c}_mean" for c in _METRIC_COLUMNS]
+    out_df = df.groupby(["year", "source"], sort=True)[mean_cols].mean().reset_index()
 
     out = os.path.join(cfg.metrics_dir, "per_year.csv")
-    fieldnames = ["year","source","gunning_fog_mean","dale_chall_mean","flesch_reading_ease_mean"]
-    write_csv(out, out_rows, fieldnames)
+    ensure_parent_dir(out)
+    out_df.to_csv(out, index=False)
     return out
@@ -1,34 +1,71 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
 
-from .utils import ensure_parent_dir, sha1_hex
+from .utils import hash_hex
+
+
+class CacheEntry(NamedTuple):
+    value: bytes
+    # validators from the response, for conditional re-fetches
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # time.time() of the download or last successful revalidation; None for pre-validator entries
+    fetched_at: Optional[float]
 
 
 class SimpleCache:
+    """Key/value blob store backed by a single SQLite file in ``cache_dir``."""
+
+    DB_NAME = "cache.sqlite"
+
     def __init__(self, cache_dir: str) -> None:
         self.cache_dir = cache_dir
         os.makedirs(self.cache_dir, exist_ok=True)
-
-    def _path_for(self, key: str) -> str:
-        digest = sha1_hex(key)
-        subdir = os.path.join(self.cache_dir, digest[:2])
-        os.makedirs(subdir, exist_ok=True)
-        return os.path.join(subdir, f"{digest}.bin")
+        self.path = os.path.join(self.cache_dir, self.DB_NAME)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "digest TEXT PRIMARY KEY, value BLOB NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        # databases created before validators were stored
+        cols = {row[1] for row in self.conn.execute("PRAGMA table_info(entries)")}
+        for col, typ in (("etag", "TEXT"), ("last_modified", "TEXT"), ("fetched_at", "REAL")):
+            if col not in cols:
+                self.conn.execute(f"ALTER TABLE entries ADD COLUMN {col} {typ}")
 
     def get(self, key: str) -> Optional[bytes]:
-        path = self._path_for(key)
-        if os.path.exists(path):
-            try:
-                with open(path, "rb") as f:
-                    return f.read()
-            except Exception:
-                return None
-        return None
-
-    def set(self, key: str, value: bytes) -> None:
-        path = self._path_for(key)
-        ensure_parent_dir(path)
-        with open(path, "wb") as f:
-            f.write(value)
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM entries WHERE digest = ?", (hash_hex(key),)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, etag, last_modified, fetched_at FROM entries WHERE digest = ?", (hash_hex(key),)
+            ).fetchone()
+        return CacheEntry(bytes(row[0]), row[1], row[2], row[3]) if row else None
+
+    def set(self, key: str, value: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (digest, value, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (hash_hex(key), value, etag, last_modified, time.time()),
+            )
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as freshly validated (after a 304)."""
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE entries SET fetched_at = ? WHERE digest = ?", (time.time(), hash_hex(key)))
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -3,55 +3,79 @@ from __future__ import annotations
 import argparse
 import csv
 import os
+import threading
 from datetime import datetime
+from typing import Callable, List, TypeVar
 
-from .aggregation import aggregate_per_issue, aggregate_per_year, compute_per_article, write_per_article_csv
+from .aggregation import aggregate_per_issue, aggregate_per_year, compute_per_article
 from .config import Settings, ensure_dirs, load_cookies, find_default_cookies
-from .http import HttpClient
+from .http_async import AsyncHttpClient, make_http_client, map_concurrent
 from .ny_scraper import Issue, fetch_magazine_issue, fetch_web_for_issue_week, get_issues_for_year
+from .parsing import HTML_PARSERS
+
+T = TypeVar("T")
+
+
+def _map_issues(http, cfg: Settings, fn: Callable[[Issue], T], issues: List[Issue]) -> List[T]:
+    # Issues are fetched concurrently only when the client can multiplex requests.
+    if isinstance(http, AsyncHttpClient):
+        return map_concurrent(fn, issues, cfg.max_concurrency)
+    return [fn(issue) for issue in issues]
 
 
 def cmd_fetch_magazine(args) -> None:
-    cfg = Settings()
+    cfg = Settings(html_parser=args.html_parser)
     ensure_dirs(cfg)
     cookies_path = args.cookies or find_default_cookies()
     cookies = load_cookies(cookies_path) if cookies_path else []
-    http = HttpClient(cfg, cookies=cookies)
+    http = make_http_client(cfg, cookies=cookies)
 
     issues_log_path = os.path.join(cfg.logs_dir, "issues_log.csv")
     os.makedirs(cfg.logs_dir, exist_ok=True)
-    if not os.path.exists(issues_log_path):
-        with open(issues_log_path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["issue_date", "issue_url", "num_articles"])
-
-    for year in range(args.year_start, args.year_end + 1):
-        issues = get_issues_for_year(http, cfg, year)
-        for issue in issues:
-            arts = fetch_magazine_issue(http, cfg, issue)
-            with open(issues_log_path, "a", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow([issue.date.strftime("%Y-%m-%d"), issue.url, len(arts)])
+    # one line-buffered handle for the whole run; each row still lands on disk as it is written
+    log_f = open(issues_log_path, "a+", newline="", encoding="utf-8", buffering=1)
+    log_w = csv.writer(log_f)
+    if os.fstat(log_f.fileno()).st_size == 0:
+        log_w.writerow(["issue_date", "issue_url", "num_articles"])
+
+    # rows are written as each issue finishes, so a failing issue cannot lose
+    # the resume log of the ones fetched alongside it
+    log_lock = threading.Lock()
+
+    def fetch_and_log(issue: Issue) -> int:
+        arts = fetch_magazine_issue(http, cfg, issue)
+        with log_lock:
+            log_w.writerow([issue.date.strftime("%Y-%m-%d"), issue.url, len(arts)])
+        return len(arts)
+
+    try:
+        for year in range(args.year_start, args.year_end + 1):
+            issues = get_issues_for_year(http, cfg, year)
+            _map_issues(http, cfg, fetch_and_log, issues)
+    finally:
+        log_f.close()
+        http.close()
 
 
 def cmd_fetch_web(args) -> None:
-    cfg = Settings()
+    cfg = Settings(html_parser=args.html_parser)
     ensure_dirs(cfg)
     cookies_path = args.cookies or find_default_cookies()
     cookies = load_cookies(cookies_path) if cookies_path else []
-    http = HttpClient(cfg, cookies=cookies)
+    http = make_http_client(cfg, cookies=cookies)
 
-    for year in range(args.year_start, args.year_end + 1):
-        issues = get_issues_for_year(http, cfg, year)
-        for issue in issues:
-            fetch_web_for_issue_week(http, cfg, issue)
+    try:
+        for year in range(args.year_start, args.year_end + 1):
+            issues = get_issues_for_year(http, cfg, year)
+            _map_issues(http, cfg, lambda i: fetch_web_for_issue_week(http, cfg, i), issues)
+    finally:
+        http.close()
 
 
 def cmd_compute_metrics(args) -> None:
     cfg = Settings()
     ensure_dirs(cfg)
-    rows = compute_per_article(cfg)
-    out = write_per_article_csv(cfg, rows)
+    out = compute_per_article(cfg, jobs=args.jobs, force=args.force)
     print(f"wrote per-article metrics: {out}")
 
 
@@ -59,15 +83,19 @@ def cmd_aggregate(args) -> None:
     cfg = Settings()
     ensure_dirs(cfg)
     # per-issue
-    rows = compute_per_article(cfg)
-    per_article = write_per_article_csv(cfg, rows)
-    per_issue = aggregate_per_issue(cfg, rows)
+    per_article = compute_per_article(cfg, jobs=args.jobs, force=args.force)
+    per_issue = aggregate_per_issue(cfg, per_article)
     per_year = aggregate_per_year(cfg, per_issue)
     print(f"wrote: {per_article}\n{per_issue}\n{per_year}")
 
 
 def cmd_visualize(args) -> None:
     import csv
+
+    import matplotlib
+
+    # headless: skip GUI backend discovery/initialisation
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt
 
     cfg = Settings()
@@ -83,25 +111,26 @@ def cmd_visualize(args) -> None:
             f_re = float(row["flesch_reading_ease_mean"]) if row["flesch_reading_ease_mean"] else None
             data[source].append((year, g, d, f_re))
 
-    plt.figure(figsize=(10,6))
+    fig, ax = plt.subplots(figsize=(10, 6))
     for source, series in data.items():
         series.sort(key=lambda x: x[0])
         years = [x[0] for x in series]
         gvals = [x[1] for x in series]
         dvals = [x[2] for x in series]
         fvals = [x[3] for x in series]
-        plt.plot(years, gvals, label=f"Gunning Fog ({source})")
-        plt.plot(years, dvals, label=f"Dale–Chall ({source})")
-        plt.plot(years, fvals, label=f"Flesch Reading Ease ({source})")
-
-    plt.title("New Yorker Readability by Year (Magazine vs Web)")
-    plt.xlabel("Year")
-    plt.ylabel("Score (higher=flesch easier; others harder)")
-    plt.legend()
+        ax.plot(years, gvals, label=f"Gunning Fog ({source})")
+        ax.plot(years, dvals, label=f"Dale–Chall ({source})")
+        ax.plot(years, fvals, label=f"Flesch Reading Ease ({source})")
+
+    ax.set_title("New Yorker Readability by Year (Magazine vs Web)")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Score (higher=flesch easier; others harder)")
+    ax.legend()
     out_path = os.path.join(cfg.metrics_dir, "yearly_trends.png")
     ensure_dirs(cfg)
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
     print(f"wrote visualization: {out_path}")
 
 
@@ -113,19 +142,25 @@ def build_parser() -> argparse.ArgumentParser:
     fm.add_argument("--year-start", type=int, required=True)
     fm.add_argument("--year-end", type=int, required=True)
     fm.add_argument("--cookies", type=str, default=None, help="Path to cookies.json (default: auto-detect)")
+    fm.add_argument("--html-parser", choices=HTML_PARSERS, default="auto", help="auto: selectolax (lexbor) when installed, else lxml")
     fm.set_defaults(func=cmd_fetch_magazine)
 
     fw = sub.add_parser("fetch-web", help="Fetch web-only content aligned to issues (±3 days)")
     fw.add_argument("--year-start", type=int, required=True)
     fw.add_argument("--year-end", type=int, required=True)
     fw.add_argument("--cookies", type=str, default=None, help="Path to cookies.json (default: auto-detect)")
+    fw.add_argument("--html-parser", choices=HTML_PARSERS, default="auto", help="auto: selectolax (lexbor) when installed, else lxml")
     fw.set_defaults(func=cmd_fetch_web)
 
     cm = sub.add_parser("compute-metrics", help="Compute per-article metrics")
     cm.add_argument("--source", choices=["magazine","web","all"], default="all")
+    cm.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    cm.add_argument("--force", action="store_true", help="Ignore cached readability results and unchanged-file index; recompute everything")
     cm.set_defaults(func=cmd_compute_metrics)
 
     ag = sub.add_parser("aggregate", help="Aggregate per-issue and per-year metrics")
+    ag.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    ag.add_argument("--force", action="store_true", help="Ignore cached readability results and unchanged-file index; recompute everything")
     ag.set_defaults(func=cmd_aggregate)
 
     vz = sub.add_parser("visualize", help="Create yearly trend visualization")
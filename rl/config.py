@@ -10,16 +10,26 @@ from typing import Dict, List, Optional
 class Settings:
     base_url: str = "https://www.newyorker.com"
     data_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data"))
-    cache_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "cache", "http"))
+    cache_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "cache", "http_v2"))
     raw_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "raw"))
     extracted_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "extracted"))
     metrics_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "metrics"))
     logs_dir: str = os.path.abspath(os.path.join(os.getcwd(), "data", "logs"))
+    # readability results memoized by text hash; None disables the cache
+    metrics_cache_path: Optional[str] = os.path.abspath(os.path.join(os.getcwd(), "data", "cache", "metrics.sqlite"))
 
     # politeness
     request_timeout_s: float = 30.0
     request_delay_s: float = 1.0
     max_retries: int = 3
+    # issues fetched concurrently / requests in flight (async client only)
+    max_concurrency: int = 5
+    # cached sitemap index older than this is revalidated with a conditional GET
+    sitemap_index_max_age_s: float = 86400.0
+
+    # article HTML parser: "auto" uses selectolax's lexbor when installed, "lxml"
+    # always uses lxml (the two can build different trees from malformed markup)
+    html_parser: str = "auto"
 
     # web alignment window (± days)
     week_radius_days: int = 3
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from importlib.resources import files
+
+# Dale–Chall list of ~3000 words familiar to fourth-graders (same list textstat ships).
+# Any word not in it counts as "difficult" for the Dale–Chall score.
+EASY: frozenset[str] = frozenset(files(__package__).joinpath("dale_chall.txt").read_text(encoding="utf-8").split())
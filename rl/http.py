@@ -1,15 +1,46 @@
 from __future__ import annotations
 
+import logging
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
 
 import requests
-from requests import Response
 
-from .cache import SimpleCache
+from .cache import CacheEntry, SimpleCache
 from .config import Settings
 from .utils import sleep_polite
 
+log = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    content: bytes
+    url: str
+    from_cache: bool
+
+
+def _needs_revalidation(entry: CacheEntry, fresh_since: Optional[float]) -> bool:
+    # entries fetched (or last revalidated) before fresh_since may be out of date
+    return fresh_since is not None and (entry.fetched_at is None or entry.fetched_at < fresh_since)
+
+
+def _conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _serve_stale(entry: CacheEntry, url: str, exc: Optional[Exception]) -> CachedResponse:
+    # revalidation failed (offline, blocked); the cached copy beats no copy
+    log.warning("revalidating %s failed (%s); serving the cached copy", url, exc or "retries exhausted")
+    return CachedResponse(entry.value, url, True)
+
 
 class HttpClient:
     def __init__(self, cfg: Settings, cookies: Optional[List[Dict[str, str]]] = None) -> None:
@@ -20,71 +51,124 @@ class HttpClient:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         })
         self.cache = SimpleCache(cfg.cache_dir)
+        # Playwright state, created lazily on the render thread
+        self._render_lock = threading.Lock()
+        self._render_thread: Optional[ThreadPoolExecutor] = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
         if cookies:
             for c in cookies:
                 # requests cookie requires domain without leading dot sometimes
                 domain = c.get("domain", ".newyorker.com").lstrip(".")
                 self.session.cookies.set(c["name"], c["value"], domain=domain, path=c.get("path", "/"))
 
-    def get(self, url: str, use_cache: bool = True) -> Response:
-        if use_cache:
-            cached = self.cache.get(url)
-            if cached is not None:
-                # Build a fake Response
-                r = requests.Response()
-                r.status_code = 200
-                r._content = cached
-                r.url = url
-                r.headers["X-Cache-Hit"] = "1"
-                return r
+    def get(self, url: str, use_cache: bool = True, fresh_since: Optional[float] = None) -> CachedResponse:
+        """Fetch ``url``, serving it from the cache when possible.
+
+        Cached entries are returned without a request unless they were fetched
+        before ``fresh_since`` (epoch seconds); those are revalidated with a
+        conditional GET and the cached body is kept on 304 Not Modified, or
+        when the revalidation request fails.
+        """
+        entry = self.cache.get_entry(url) if use_cache else None
+        if entry is not None and not _needs_revalidation(entry, fresh_since):
+            return CachedResponse(entry.value, url, True)
+        headers = _conditional_headers(entry)
 
         last_exc: Optional[Exception] = None
         for attempt in range(self.cfg.max_retries):
             try:
                 sleep_polite(self.cfg.request_delay_s)
-                r = self.session.get(url, timeout=self.cfg.request_timeout_s)
+                r = self.session.get(url, headers=headers, timeout=self.cfg.request_timeout_s)
+                if r.status_code == 304 and entry is not None:
+                    self.cache.touch(url)
+                    return CachedResponse(entry.value, url, True)
                 if r.status_code == 200:
                     if use_cache:
-                        self.cache.set(url, r.content)
-                    return r
+                        self.cache.set(url, r.content, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                    return CachedResponse(r.content, url, False)
                 # For soft-blocks, backoff
                 if r.status_code in (403, 429, 503):
                     time.sleep(2.0 * (attempt + 1))
                     continue
                 r.raise_for_status()
-                return r
+                return CachedResponse(r.content, url, False)
             except Exception as e:
                 last_exc = e
                 time.sleep(1.0 * (attempt + 1))
+        if entry is not None:
+            return _serve_stale(entry, url, last_exc)
         if last_exc:
             raise last_exc
         raise RuntimeError("HTTP get failed for unknown reasons")
 
-    def get_rendered(self, url: str, playwright_timeout_ms: int = 20000) -> str:
+    def close(self) -> None:
+        with self._render_lock:
+            if self._render_thread is not None:
+                self._render_thread.submit(self._shutdown_browser).result()
+                self._render_thread.shutdown()
+                self._render_thread = None
+        self.session.close()
+
+    def _ensure_browser(self) -> None:
+        # Runs on the render thread; Playwright's sync objects are bound to it.
+        if self._context is not None:
+            return
         # Lazy import to avoid heavy startup cost
         from playwright.sync_api import sync_playwright
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=self.cfg.user_agent)
-            # transfer cookies into context
-            for c in self.session.cookies:
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._context = self._browser.new_context(user_agent=self.cfg.user_agent)
+        # transfer cookies into context once
+        for c in self.session.cookies:
+            try:
+                self._context.add_cookies([
+                    {
+                        "name": c.name,
+                        "value": c.value,
+                        "domain": c.domain if c.domain else "www.newyorker.com",
+                        "path": c.path or "/",
+                    }
+                ])
+            except Exception:
+                pass
+
+    def _shutdown_browser(self) -> None:
+        for obj, method in ((self._context, "close"), (self._browser, "close"), (self._playwright, "stop")):
+            if obj is not None:
                 try:
-                    context.add_cookies([
-                        {
-                            "name": c.name,
-                            "value": c.value,
-                            "domain": c.domain if c.domain else "www.newyorker.com",
-                            "path": c.path or "/",
-                        }
-                    ])
+                    getattr(obj, method)()
                 except Exception:
                     pass
-            page = context.new_page()
+        self._playwright = self._browser = self._context = None
+
+    def _render(self, url: str, playwright_timeout_ms: int) -> str:
+        self._ensure_browser()
+        page = self._context.new_page()
+        try:
             page.goto(url, timeout=playwright_timeout_ms)
             page.wait_for_load_state("networkidle")
             html = page.content()
-            browser.close()
-            # cache rendered content too
-            self.cache.set(url + "#rendered", html.encode("utf-8"))
-            return html
+        except Exception:
+            if not self._browser.is_connected():
+                # relaunch on the next call
+                self._shutdown_browser()
+            raise
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+        # cache rendered content too
+        self.cache.set(url + "#rendered", html.encode("utf-8"))
+        return html
+
+    def get_rendered(self, url: str, playwright_timeout_ms: int = 20000) -> str:
+        # One browser and context are reused across calls; each call only opens a page.
+        with self._render_lock:
+            if self._render_thread is None:
+                self._render_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rl-playwright")
+            future = self._render_thread.submit(self._render, url, playwright_timeout_ms)
+        return future.result()
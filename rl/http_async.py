@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+# Optional dependencies
+try:
+    import httpx  # type: ignore
+    from aiolimiter import AsyncLimiter  # type: ignore
+except Exception:  # pragma: no cover
+    httpx = None
+    AsyncLimiter = None
+
+from .config import Settings
+from .http import CachedResponse, HttpClient, _conditional_headers, _needs_revalidation, _serve_stale
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def async_available() -> bool:
+    return httpx is not None and AsyncLimiter is not None
+
+
+def _http2_supported() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class AsyncHttpClient:
+    """Drop-in replacement for HttpClient built on httpx.AsyncClient.
+
+    Requests run on a private event-loop thread, so `get` only blocks its
+    calling thread: scraper functions running in several threads share one
+    connection pool, with at most `cfg.max_concurrency` requests in flight
+    and a global rate of one request per `cfg.request_delay_s`.
+    """
+
+    def __init__(self, cfg: Settings, cookies: Optional[List[Dict[str, str]]] = None) -> None:
+        if not async_available():
+            raise RuntimeError("AsyncHttpClient requires httpx and aiolimiter")
+        self.cfg = cfg
+        # sync client: shares the cache and serves Playwright-rendered fetches
+        self._sync = HttpClient(cfg, cookies=cookies)
+        self.cache = self._sync.cache
+
+        jar = httpx.Cookies()
+        for c in cookies or []:
+            domain = c.get("domain", ".newyorker.com").lstrip(".")
+            jar.set(c["name"], c["value"], domain=domain, path=c.get("path", "/"))
+        self._client = httpx.AsyncClient(
+            http2=_http2_supported(),
+            timeout=cfg.request_timeout_s,
+            headers=dict(self._sync.session.headers),
+            cookies=jar,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=cfg.max_concurrency),
+        )
+        self._sem = asyncio.Semaphore(cfg.max_concurrency)
+        self._limiter = AsyncLimiter(1, cfg.request_delay_s) if cfg.request_delay_s > 0 else None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="rl-http", daemon=True)
+        self._thread.start()
+
+    async def aget(self, url: str, use_cache: bool = True, fresh_since: Optional[float] = None) -> CachedResponse:
+        entry = self.cache.get_entry(url) if use_cache else None
+        if entry is not None and not _needs_revalidation(entry, fresh_since):
+            return CachedResponse(entry.value, url, True)
+        headers = _conditional_headers(entry)
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(self.cfg.max_retries):
+            try:
+                async with self._sem:
+                    if self._limiter is not None:
+                        await self._limiter.acquire()
+                    r = await self._client.get(url, headers=headers)
+                if r.status_code == 304 and entry is not None:
+                    self.cache.touch(url)
+                    return CachedResponse(entry.value, url, True)
+                if r.status_code == 200:
+                    if use_cache:
+                        self.cache.set(url, r.content, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                    return CachedResponse(r.content, url, False)
+                # For soft-blocks, backoff
+                if r.status_code in (403, 429, 503):
+                    await asyncio.sleep(2.0 * (attempt + 1))
+                    continue
+                r.raise_for_status()
+                return CachedResponse(r.content, url, False)
+            except Exception as e:
+                last_exc = e
+                await asyncio.sleep(1.0 * (attempt + 1))
+        if entry is not None:
+            return _serve_stale(entry, url, last_exc)
+        if last_exc:
+            raise last_exc
+        raise RuntimeError("HTTP get failed for unknown reasons")
+
+    def get(self, url: str, use_cache: bool = True, fresh_since: Optional[float] = None) -> CachedResponse:
+        coro = self.aget(url, use_cache=use_cache, fresh_since=fresh_since)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def get_rendered(self, url: str, playwright_timeout_ms: int = 20000) -> str:
+        return self._sync.get_rendered(url, playwright_timeout_ms=playwright_timeout_ms)
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._sync.close()
+
+
+def make_http_client(cfg: Settings, cookies: Optional[List[Dict[str, str]]] = None):
+    """AsyncHttpClient when httpx/aiolimiter are installed, HttpClient otherwise."""
+    if async_available():
+        return AsyncHttpClient(cfg, cookies=cookies)
+    return HttpClient(cfg, cookies=cookies)
+
+
+def map_concurrent(fn: Callable[[T], R], items: Iterable[T], limit: int) -> List[R]:
+    """Run ``fn`` over ``items`` in worker threads, at most ``limit`` at a time, preserving order."""
+
+    async def run() -> List[R]:
+        sem = asyncio.Semaphore(limit)
+
+        async def bounded(item: T) -> R:
+            async with sem:
+                return await asyncio.to_thread(fn, item)
+
+        return await asyncio.gather(*(bounded(i) for i in items))
+
+    return asyncio.run(run())
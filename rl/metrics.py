@@ -2,21 +2,37 @@ from __future__ import annotations
 
 import math
 import re
-from typing import Dict, Optional
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .dale_chall_words import EASY
 
 # Optional dependency
 try:
-    import textstat  # type: ignore
+    from numba import njit  # type: ignore
 except Exception:  # pragma: no cover
-    textstat = None
+    njit = None
 
 _WORD_RE = re.compile(r"[A-Za-z']+")
 _SENTENCE_RE = re.compile(r"[.!?]+")
-_VOWEL_RE = re.compile(r"[aeiouy]+", re.I)
+
+# byte -> b"1" for vowels, b"0" otherwise; a vowel group starts at every "01"
+_VOWEL_LUT = bytes(ord("1") if chr(i).lower() in "aeiouy" else ord("0") for i in range(256))
+_VOWEL_MASK = np.frombuffer(_VOWEL_LUT, dtype=np.uint8) == ord("1")
+
+# Bump whenever scores for the same text would change; invalidates rl.metrics_cache.
+METRICS_VERSION = 5
+
+_FLOAT_KEYS = ("gunning_fog", "dale_chall", "flesch_reading_ease")
+_INT_KEYS = ("num_words", "num_sentences")
 
 
-def _tokenize_words(text: str):
-    return _WORD_RE.findall(text)
+def _tokenize_words(text_lc: str) -> Iterator[Tuple[int, int]]:
+    # (start, end) spans of the words in an already lowercased text
+    return (m.span() for m in _WORD_RE.finditer(text_lc))
 
 
 def _count_sentences(text: str) -> int:
@@ -27,79 +43,212 @@ def _count_sentences(text: str) -> int:
 
 
 def _count_syllables_in_word(word: str) -> int:
-    w = word.lower()
+    b = word.lower().encode("ascii", "ignore")
     # Remove trailing 'e' (silent e)
-    if len(w) > 2 and w.endswith("e") and not w.endswith("le"):
-        w = w[:-1]
-    groups = _VOWEL_RE.findall(w)
-    syllables = len(groups)
-    return max(1, syllables)
-
-
-def _count_syllables(words):
-    return sum(_count_syllables_in_word(w) for w in words)
-
-
-def _count_complex_words(words):
-    # words with 3+ syllables
-    complex_count = 0
-    for w in words:
-        if _count_syllables_in_word(w) >= 3:
-            complex_count += 1
-    return complex_count
+    if len(b) > 2 and b[-1] == ord("e") and b[-2] != ord("l"):
+        b = b[:-1]
+    bits = b"0" + b.translate(_VOWEL_LUT)
+    return max(1, bits.count(b"01"))
+
+
+def _count_syllables_spans(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # Same estimate as _count_syllables_in_word, for every word span of a
+    # lowercase ASCII buffer at once. Vowels only occur inside words, so vowel
+    # groups never reach across a word boundary.
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    vowel = _VOWEL_MASK[buf]
+    lens = ends - starts
+    last = ends - 1
+    # silent trailing 'e' (but not "-le") does not count as a vowel
+    silent = (lens > 2) & (buf[last] == ord("e")) & (buf[last - 1] != ord("l"))
+    vowel[last[silent]] = False
+    # a vowel group starts wherever the vowel bitmap flips from 0 to 1
+    group_starts = vowel.copy()
+    group_starts[1:] &= vowel[1:] ^ vowel[:-1]
+    word_idx = np.searchsorted(starts, np.flatnonzero(group_starts), side="right") - 1
+    syllables = np.bincount(word_idx, minlength=len(starts))
+    return np.maximum(syllables, 1)
+
+
+def _segment_sum(values: np.ndarray, offsets: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(counts), dtype=np.int64)
+    nonempty = counts > 0
+    if nonempty.any():
+        out[nonempty] = np.add.reduceat(values.astype(np.int64), offsets[nonempty])
+    return out
+
+
+def _count_difficult(words: Iterable[str]) -> int:
+    # lowercase words only
+    return sum(1 for w in words if w not in EASY)
+
+
+def _empty_batch(n: int) -> Dict[str, np.ndarray]:
+    out: Dict[str, np.ndarray] = {k: np.full(n, np.nan) for k in _FLOAT_KEYS}
+    out.update({k: np.zeros(n, dtype=np.int64) for k in _INT_KEYS})
+    return out
+
+
+def _scan_counts(buf: np.ndarray) -> Tuple[int, int, int, int]:
+    # Single pass over the UTF-8 bytes of a text, returning
+    # (num_words, num_sentences, syllables, complex_words) with the same
+    # rules as the regex-based path. Difficult words need the easy-word set
+    # and are counted by the caller. Compiled with numba when
+    # available; plain Python otherwise (used by tests only).
+    num_words = 0
+    num_sentences = 0
+    syllables = 0
+    complex_words = 0
+    word_len = 0
+    word_syls = 0
+    in_vowel_group = False
+    last_starts_group = False
+    last = 0
+    prev = 0
+    sentence_has_text = False
+    n = len(buf)
+    for i in range(n + 1):
+        c = buf[i] if i < n else 32
+        if 65 <= c <= 90:
+            c += 32
+        if (97 <= c <= 122) or c == 39:
+            is_vowel = c == 97 or c == 101 or c == 105 or c == 111 or c == 117 or c == 121
+            last_starts_group = is_vowel and not in_vowel_group
+            if last_starts_group:
+                word_syls += 1
+            in_vowel_group = is_vowel
+            prev = last
+            last = c
+            word_len += 1
+        elif word_len > 0:
+            # silent trailing 'e' (but not "-le")
+            if word_len > 2 and last == 101 and prev != 108 and last_starts_group:
+                word_syls -= 1
+            if word_syls < 1:
+                word_syls = 1
+            num_words += 1
+            syllables += word_syls
+            if word_syls >= 3:
+                complex_words += 1
+            word_len = 0
+            word_syls = 0
+            in_vowel_group = False
+            last = 0
+            prev = 0
+        if i < n:
+            if c == 46 or c == 33 or c == 63:
+                if sentence_has_text:
+                    num_sentences += 1
+                sentence_has_text = False
+            elif c < 128:
+                if not (c == 32 or 9 <= c <= 13 or 28 <= c <= 31):
+                    sentence_has_text = True
+            elif c >= 192:
+                # lead byte of a multi-byte character: blank if str.isspace()
+                # (NBSP, NEL, U+1680, U+2000-200A, U+2028/2029, U+202F, U+205F,
+                # U+3000); continuation bytes follow their lead byte's verdict
+                c1 = buf[i + 1] if i + 1 < n else 0
+                c2 = buf[i + 2] if i + 2 < n else 0
+                blank = (
+                    (c == 0xC2 and (c1 == 0xA0 or c1 == 0x85))
+                    or (c == 0xE1 and c1 == 0x9A and c2 == 0x80)
+                    or (c == 0xE2 and c1 == 0x80 and (0x80 <= c2 <= 0x8A or c2 == 0xA8 or c2 == 0xA9 or c2 == 0xAF))
+                    or (c == 0xE2 and c1 == 0x81 and c2 == 0x9F)
+                    or (c == 0xE3 and c1 == 0x80 and c2 == 0x80)
+                )
+                if not blank:
+                    sentence_has_text = True
+    if sentence_has_text:
+        num_sentences += 1
+    if num_sentences < 1:
+        num_sentences = 1
+    return num_words, num_sentences, syllables, complex_words
+
+
+_scan = njit(cache=True)(_scan_counts) if njit is not None else None
+
+
+@dataclass(slots=True)
+class _Counters:
+    # Everything the three formulas need, one entry per text of a batch.
+    words: np.ndarray
+    sentences: np.ndarray
+    syllables: np.ndarray
+    complex_: np.ndarray
+    difficult: np.ndarray
+
+
+def _scan_counters(texts: List[str]) -> _Counters:
+    # Empty texts get all-zero counters (including sentences).
+    n = len(texts)
+    if _scan is not None:
+        counters = np.zeros((5, n), dtype=np.int64)
+        for i, t in enumerate(texts):
+            if not t:
+                continue
+            counters[:4, i] = _scan(np.frombuffer(t.encode("utf-8", "ignore"), dtype=np.uint8))
+            counters[4, i] = _count_difficult(_WORD_RE.findall(t.lower()))
+        return _Counters(*counters)
+
+    # lowercase once and tokenize the whole batch; the separator keeps words
+    # from spanning two texts
+    lowered = [t.lower() for t in texts]
+    joined = " ".join(lowered)
+    spans = np.fromiter(chain.from_iterable(_tokenize_words(joined)), dtype=np.int64).reshape(-1, 2)
+    starts, ends = spans[:, 0], spans[:, 1]
+    # "replace" keeps one byte per character, so string offsets stay valid
+    buf = np.frombuffer(joined.encode("ascii", "replace"), dtype=np.uint8)
+    syls = _count_syllables_spans(buf, starts, ends)
+    easy = np.fromiter((joined[a:b] in EASY for a, b in spans.tolist()), dtype=bool, count=len(spans))
+
+    widths = np.fromiter((len(t) + 1 for t in lowered), dtype=np.int64, count=n)
+    text_starts = np.cumsum(widths) - widths
+    counts = np.bincount(np.searchsorted(text_starts, starts, side="right") - 1, minlength=n).astype(np.int64)
+    offsets = np.cumsum(counts) - counts
+
+    return _Counters(
+        words=counts,
+        sentences=np.fromiter((_count_sentences(t) if t else 0 for t in texts), dtype=np.int64, count=n),
+        syllables=_segment_sum(syls, offsets, counts),
+        complex_=_segment_sum(syls >= 3, offsets, counts),
+        difficult=_segment_sum(~easy, offsets, counts),
+    )
+
+
+def _formulas(c: _Counters) -> Dict[str, np.ndarray]:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        words_f = np.where(c.words > 0, c.words, np.nan)
+        asl = c.words / np.maximum(1, c.sentences)
+        asw = c.syllables / words_f
+        perc_complex = (c.complex_ / words_f) * 100.0
+        pdw = (c.difficult / words_f) * 100.0
+
+    out = _empty_batch(len(c.words))
+    out["flesch_reading_ease"] = 206.835 - 1.015 * asl - 84.6 * asw
+    out["gunning_fog"] = 0.4 * (asl + perc_complex)
+    out["dale_chall"] = 0.1579 * pdw + 0.0496 * asl + np.where(pdw > 5.0, 3.6365, 0.0)
+    out["num_words"] = c.words
+    out["num_sentences"] = c.sentences
+    return out
+
+
+def readability_metrics_batch(texts: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Compute readability metrics for many texts at once.
+
+    Returns a dict of arrays aligned with ``texts``; metrics that cannot be
+    computed (empty text, no words) are NaN. The five counters are gathered in
+    one pass per text and all three formulas derived from them together.
+    """
+    return _formulas(_scan_counters([t.strip() for t in texts]))
 
 
 def readability_metrics(text: str) -> Dict[str, Optional[float]]:
-    text = text.strip()
-    if not text:
-        return {"gunning_fog": None, "dale_chall": None, "flesch_reading_ease": None,
-                "num_words": 0, "num_sentences": 0}
-
-    if textstat is not None:
-        try:
-            return {
-                "gunning_fog": float(textstat.gunning_fog(text)),
-                "dale_chall": float(textstat.dale_chall_readability_score(text)),
-                "flesch_reading_ease": float(textstat.flesch_reading_ease(text)),
-                "num_words": int(textstat.lexicon_count(text, removepunct=True)),
-                "num_sentences": int(textstat.sentence_count(text)),
-            }
-        except Exception:
-            # fall back to native impl
-            pass
-
-    words = _tokenize_words(text)
-    num_words = len(words)
-    num_sentences = _count_sentences(text)
-    syllables = _count_syllables(words)
-    complex_words = _count_complex_words(words)
-
-    if num_words == 0:
-        return {"gunning_fog": None, "dale_chall": None, "flesch_reading_ease": None,
-                "num_words": 0, "num_sentences": num_sentences}
-
-    # Flesch Reading Ease
-    asl = num_words / max(1, num_sentences)
-    asw = syllables / num_words
-    flesch = 206.835 - 1.015 * asl - 84.6 * asw
-
-    # Gunning Fog
-    perc_complex = (complex_words / num_words) * 100.0
-    gunning = 0.4 * (asl + perc_complex)
-
-    # Dale–Chall (approximate without full easy-word list)
-    # As an approximation, treat words <= 3 letters as "easy" and penalize long words.
-    # If accuracy matters, install `textstat`.
-    difficult = sum(1 for w in words if len(w) > 3)
-    pdw = (difficult / num_words) * 100.0
-    dale = 0.1579 * pdw + 0.0496 * asl
-    if pdw > 5.0:
-        dale += 3.6365
-
-    return {
-        "gunning_fog": gunning,
-        "dale_chall": dale,
-        "flesch_reading_ease": flesch,
-        "num_words": num_words,
-        "num_sentences": num_sentences,
-    }
+    batch = readability_metrics_batch([text])
+    result: Dict[str, Optional[float]] = {}
+    for k in _FLOAT_KEYS:
+        v = float(batch[k][0])
+        result[k] = None if math.isnan(v) else v
+    for k in _INT_KEYS:
+        result[k] = int(batch[k][0])
+    return result
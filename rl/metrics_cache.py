@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import METRICS_VERSION, readability_metrics_batch
+from .utils import ensure_parent_dir, hash_digest
+
+# column order of the cached tuple
+_COLUMNS = ("num_words", "num_sentences", "gunning_fog", "dale_chall", "flesch_reading_ease")
+# stay well below SQLite's host-parameter limit
+_SELECT_BATCH = 500
+# bump when the key scheme changes; stored with METRICS_VERSION in PRAGMA user_version
+_KEY_VERSION = 2
+_USER_VERSION = _KEY_VERSION * 1000 + METRICS_VERSION
+
+Entry = Tuple[int, int, Optional[float], Optional[float], Optional[float]]
+
+
+def text_key(text: str) -> bytes:
+    return hash_digest(text)
+
+
+class MetricsCache:
+    def __init__(self, path: str) -> None:
+        ensure_parent_dir(path)
+        self.conn = sqlite3.connect(path, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            "hash BLOB PRIMARY KEY, num_words INT, num_sentences INT, gf REAL, dc REAL, fre REAL)"
+        )
+        (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+        if version != _USER_VERSION:
+            self._reset_outdated()
+
+    def _reset_outdated(self) -> None:
+        # Pool workers open the cache concurrently: re-read the version under the
+        # write lock so only the first of them clears, never after another has
+        # already inserted fresh rows.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+            if version != _USER_VERSION:
+                # different key scheme, or scores produced by a different implementation
+                self.conn.execute("DELETE FROM metrics")
+                self.conn.execute(f"PRAGMA user_version={_USER_VERSION}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def __enter__(self) -> "MetricsCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, Entry]:
+        found: Dict[bytes, Entry] = {}
+        for i in range(0, len(keys), _SELECT_BATCH):
+            batch = list(keys[i:i + _SELECT_BATCH])
+            marks = ",".join("?" * len(batch))
+            for h, *values in self.conn.execute(
+                f"SELECT hash, num_words, num_sentences, gf, dc, fre FROM metrics WHERE hash IN ({marks})",
+                batch,
+            ):
+                found[bytes(h)] = tuple(values)  # type: ignore[assignment]
+        return found
+
+    def put_many(self, items: Sequence[Tuple[bytes, Entry]]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO metrics (hash, num_words, num_sentences, gf, dc, fre) VALUES (?, ?, ?, ?, ?, ?)",
+                [(h, *values) for h, values in items],
+            )
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM metrics")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _to_entry(batch: Dict[str, np.ndarray], i: int) -> Entry:
+    def opt(v: float) -> Optional[float]:
+        return None if np.isnan(v) else float(v)
+
+    return (
+        int(batch["num_words"][i]),
+        int(batch["num_sentences"][i]),
+        opt(batch["gunning_fog"][i]),
+        opt(batch["dale_chall"][i]),
+        opt(batch["flesch_reading_ease"][i]),
+    )
+
+
+def cached_readability_metrics_batch(texts: Sequence[str], cache_path: Optional[str]) -> Dict[str, np.ndarray]:
+    """Like readability_metrics_batch, but only scores texts not already in the cache."""
+    if not cache_path:
+        return readability_metrics_batch(texts)
+
+    keys = [text_key(t) for t in texts]
+    out: Dict[str, np.ndarray] = {
+        "num_words": np.zeros(len(texts), dtype=np.int64),
+        "num_sentences": np.zeros(len(texts), dtype=np.int64),
+        "gunning_fog": np.full(len(texts), np.nan),
+        "dale_chall": np.full(len(texts), np.nan),
+        "flesch_reading_ease": np.full(len(texts), np.nan),
+    }
+    with MetricsCache(cache_path) as cache:
+        hits = cache.get_many(keys)
+        misses: List[int] = []
+        for i, k in enumerate(keys):
+            entry = hits.get(k)
+            if entry is None:
+                misses.append(i)
+                continue
+            for col, v in zip(_COLUMNS, entry):
+                out[col][i] = np.nan if v is None else v
+
+        if misses:
+            fresh = readability_metrics_batch([texts[i] for i in misses])
+            idx = np.asarray(misses, dtype=np.int64)
+            for col in _COLUMNS:
+                out[col][idx] = fresh[col]
+            cache.put_many([(keys[i], _to_entry(fresh, j)) for j, i in enumerate(misses)])
+    return out
@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import io
 import json
 import os
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
+from lxml import etree
 
 from .config import Settings
-from .http import HttpClient
+from .http import CachedResponse, HttpClient
+from .http_async import AsyncHttpClient
 from .parsing import extract_article_text, extract_meta
 from .utils import ensure_parent_dir, iso_date, safe_filename, slugify
 
+# Optional dependency
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
 
-_ISSUE_LINK_RE = re.compile(r"^/magazine/(\d{4})/(\d{2})/(\d{2})(?:/)?$")
-_MAG_ARTICLE_RE = re.compile(r"^/magazine/\d{4}/\d{2}/\d{2}/[\w\-]+/?$")
+
+# issue links (/magazine/YYYY/MM/DD) and article links (.../slug) in one pattern;
+# `slug` is None for issues
+_LINK_RE = re.compile(r"/magazine/(?P<y>\d{4})/(?P<m>\d{2})/(?P<d>\d{2})(?:/(?P<slug>[\w\-]+))?/?")
+
+# whitespace-separated words, as counted by str.split()
+_WORD_RUN_RE = re.compile(r"\S+")
+
+# CSS selectors compiled once instead of on every select() call
+_SEL_MAG_LINKS = sv.compile('a[href^="/magazine/"]')
 
 
 @dataclass
@@ -46,14 +67,19 @@ def _abs(base: str, href: str) -> str:
 def get_issues_for_year(http: HttpClient, cfg: Settings, year: int) -> List[Issue]:
     url = f"{cfg.base_url}/magazine/{year}"
     r = http.get(url)
-    soup = BeautifulSoup(r.text, "lxml")
+    soup = BeautifulSoup(r.content, "lxml")
     issues: Dict[str, Issue] = {}
-    for a in soup.select('a[href^="/magazine/"]'):
+    # nav/footer repeat the same links; classify each href once
+    seen_hrefs: Set[str] = set()
+    for a in _SEL_MAG_LINKS.select(soup):
         href = a.get("href", "")
-        m = _ISSUE_LINK_RE.match(href)
-        if not m:
+        if href in seen_hrefs:
+            continue
+        seen_hrefs.add(href)
+        m = _LINK_RE.fullmatch(href)
+        if not m or m["slug"] is not None:
             continue
-        y, mth, d = m.groups()
+        y, mth, d = m["y"], m["m"], m["d"]
         try:
             dt = datetime(int(y), int(mth), int(d))
         except Exception:
@@ -66,21 +92,91 @@ def get_issues_for_year(http: HttpClient, cfg: Settings, year: int) -> List[Issu
 
 def get_issue_articles(http: HttpClient, cfg: Settings, issue_url: str) -> List[str]:
     r = http.get(issue_url)
-    soup = BeautifulSoup(r.text, "lxml")
+    soup = BeautifulSoup(r.content, "lxml")
     urls: Set[str] = set()
-    for a in soup.select('a[href^="/magazine/"]'):
+    seen_hrefs: Set[str] = set()
+    for a in _SEL_MAG_LINKS.select(soup):
         href = a.get("href", "")
-        if _MAG_ARTICLE_RE.match(href):
+        if href in seen_hrefs:
+            continue
+        seen_hrefs.add(href)
+        m = _LINK_RE.fullmatch(href)
+        if m and m["slug"] is not None:
             urls.add(_abs(cfg.base_url, href))
     return sorted(urls)
 
 
-def _save_raw_and_extracted(article: Article, cfg: Settings) -> Tuple[str, str]:
-    year = article.published.year if article.published else (article.issue_date.year if article.issue_date else 1970)
-    base_dir_raw = os.path.join(cfg.raw_dir, article.source, f"year={year}")
-    base_dir_ex = os.path.join(cfg.extracted_dir, article.source, f"year={year}")
-    ensure_parent_dir(base_dir_raw)
-    ensure_parent_dir(base_dir_ex)
+def _has_min_words(text: str, n: int) -> bool:
+    # stops scanning at the n-th word instead of splitting the whole text
+    return next(islice(_WORD_RUN_RE.finditer(text), n - 1, None), None) is not None
+
+
+def _fetch_many(
+    http: HttpClient,
+    cfg: Settings,
+    urls: Iterable[str],
+    skip_errors: bool = False,
+    fresh_since: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[str, Optional[CachedResponse]]]:
+    # (url, response) in input order; with skip_errors a failed fetch yields None
+    # instead of raising. fresh_since maps urls to the HttpClient.get hint of the
+    # same name. The async client enforces the global request rate itself,
+    # so its fetches may overlap (and with parsing); HttpClient stays sequential.
+    hints = fresh_since or {}
+
+    def get(url: str) -> Optional[CachedResponse]:
+        if not skip_errors:
+            return http.get(url, fresh_since=hints.get(url))
+        try:
+            return http.get(url, fresh_since=hints.get(url))
+        except Exception:
+            return None
+
+    if not isinstance(http, AsyncHttpClient):
+        for url in urls:
+            yield url, get(url)
+        return
+    # at most 2 * max_concurrency responses are held ahead of the consumer
+    window: Deque[Tuple[str, Future]] = deque()
+    with ThreadPoolExecutor(max_workers=cfg.max_concurrency, thread_name_prefix="rl-fetch") as ex:
+        for url in urls:
+            window.append((url, ex.submit(get, url)))
+            if len(window) >= 2 * cfg.max_concurrency:
+                u, fut = window.popleft()
+                yield u, fut.result()
+        while window:
+            u, fut = window.popleft()
+            yield u, fut.result()
+
+
+def _write_raw_html(path: str, html: Union[str, bytes]) -> None:
+    # fetched pages are bytes, Playwright-rendered pages are str
+    try:
+        with open(path, "wb") as f:
+            f.write(html.encode("utf-8") if isinstance(html, str) else html)
+    except Exception:
+        pass
+
+
+def _year_dirs(cfg: Settings, source: str, year: int) -> Tuple[str, str]:
+    # (raw, extracted) directories for one source and year
+    return (
+        os.path.join(cfg.raw_dir, source, f"year={year}"),
+        os.path.join(cfg.extracted_dir, source, f"year={year}"),
+    )
+
+
+def _save_raw_and_extracted(
+    article: Article,
+    cfg: Settings,
+    year_dirs: Optional[Tuple[str, str]] = None,
+) -> Tuple[str, str]:
+    # year_dirs: the caller's already created _year_dirs for this article's year
+    if year_dirs is None:
+        year = article.published.year if article.published else (article.issue_date.year if article.issue_date else 1970)
+        base_dir_raw, base_dir_ex = _year_dirs(cfg, article.source, year)
+    else:
+        base_dir_raw, base_dir_ex = year_dirs
 
     slug = slugify(article.title or article.url)
     raw_path = os.path.join(base_dir_raw, safe_filename(f"{slug}.html"))
@@ -98,9 +194,12 @@ def _save_raw_and_extracted(article: Article, cfg: Settings) -> Tuple[str, str]:
         "num_chars": len(article.text),
         "text": article.text,
     }
-    ensure_parent_dir(ex_path)
-    with open(ex_path, "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False)
+    if year_dirs is None:
+        ensure_parent_dir(ex_path)
+    # encode up front and hand the file one write instead of json.dump's many small ones
+    payload = orjson.dumps(meta) if orjson is not None else json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    with open(ex_path, "wb") as f:
+        f.write(payload)
 
     return raw_path, ex_path
 
@@ -108,27 +207,26 @@ def _save_raw_and_extracted(article: Article, cfg: Settings) -> Tuple[str, str]:
 def fetch_magazine_issue(http: HttpClient, cfg: Settings, issue: Issue) -> List[Article]:
     article_urls = get_issue_articles(http, cfg, issue.url)
     results: List[Article] = []
-    for url in article_urls:
-        rr = http.get(url)
-        html = rr.text
-        text, meta = extract_article_text(html)
-        if not text or len(text.split()) < 50:
+    if not article_urls:
+        return results
+    # every article of the issue lands in the same year directories
+    year_dirs = _year_dirs(cfg, "magazine", issue.date.year)
+    raw_year_dir = year_dirs[0]
+    for d in year_dirs:
+        os.makedirs(d, exist_ok=True)
+    for url, rr in _fetch_many(http, cfg, article_urls):
+        html: Union[str, bytes] = rr.content
+        text, meta = extract_article_text(html, cfg.html_parser)
+        if not _has_min_words(text, 50):
             # fallback to rendered if needed
             try:
                 html = http.get_rendered(url)
-                text, meta = extract_article_text(html)
+                text, meta = extract_article_text(html, cfg.html_parser)
             except Exception:
                 pass
         # Save raw html
-        year = issue.date.year
         slug = slugify(meta.get("title") or url)
-        raw_path = os.path.join(cfg.raw_dir, "magazine", f"year={year}", safe_filename(f"{slug}.html"))
-        ensure_parent_dir(raw_path)
-        try:
-            with open(raw_path, "w", encoding="utf-8") as f:
-                f.write(html)
-        except Exception:
-            pass
+        _write_raw_html(os.path.join(raw_year_dir, safe_filename(f"{slug}.html")), html)
 
         art = Article(
             url=url,
@@ -140,36 +238,57 @@ def fetch_magazine_issue(http: HttpClient, cfg: Settings, issue: Issue) -> List[
             source="magazine",
             text=text or "",
         )
-        _save_raw_and_extracted(art, cfg)
+        _save_raw_and_extracted(art, cfg, year_dirs)
         results.append(art)
     return results
 
 
-def _iter_sitemap_urls(http: HttpClient, cfg: Settings) -> Iterable[Tuple[str, Optional[datetime]]]:
-    # Read sitemap index
-    idx_url = f"{cfg.base_url}/sitemaps/newyorker/sitemap-index.xml"
-    r = http.get(idx_url)
-    soup = BeautifulSoup(r.text, "xml")
-    sitemap_locs = [loc.get_text(strip=True) for loc in soup.select("sitemap > loc")]
-    for sm in sitemap_locs:
+def _iter_sitemap_entries(content: bytes, tag: str) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    # Streams (loc, lastmod) of every <tag> element (any namespace), dropping each
+    # element once read so memory stays flat on multi-MB sitemaps.
+    try:
+        for _, elem in etree.iterparse(io.BytesIO(content), tag=f"{{*}}{tag}", recover=True, huge_tree=True):
+            entry = (elem.findtext("{*}loc"), elem.findtext("{*}lastmod"))
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            yield entry
+    except etree.XMLSyntaxError:
+        # empty or hopelessly broken document
+        return
+
+
+def _parse_lastmod(lastmod: Optional[str]) -> Optional[datetime]:
+    if lastmod and lastmod.strip():
         try:
-            rs = http.get(sm)
+            return datetime.fromisoformat(lastmod.strip().replace("Z", "+00:00"))
         except Exception:
+            return None
+    return None
+
+
+def _iter_sitemap_urls(http: HttpClient, cfg: Settings) -> Iterable[Tuple[str, Optional[datetime]]]:
+    # Read sitemap index; revalidated once it is older than sitemap_index_max_age_s
+    idx_url = f"{cfg.base_url}/sitemaps/newyorker/sitemap-index.xml"
+    r = http.get(idx_url, fresh_since=time.time() - cfg.sitemap_index_max_age_s)
+    sitemap_locs: List[str] = []
+    # a cached child sitemap fetched after its index <lastmod> is still current
+    fresh_since: Dict[str, float] = {}
+    for loc, lastmod in _iter_sitemap_entries(r.content, "sitemap"):
+        if loc is None:
             continue
-        doc = BeautifulSoup(rs.text, "xml")
-        for url in doc.select("url"):
-            loc = url.select_one("loc")
-            lastmod = url.select_one("lastmod")
-            if not loc:
+        sitemap_locs.append(loc.strip())
+        lm_dt = _parse_lastmod(lastmod)
+        if lm_dt is not None:
+            fresh_since[sitemap_locs[-1]] = lm_dt.timestamp()
+    # child sitemaps are independent, so let the pooled client download ahead
+    for _, rs in _fetch_many(http, cfg, sitemap_locs, skip_errors=True, fresh_since=fresh_since):
+        if rs is None:
+            continue
+        for loc, lastmod in _iter_sitemap_entries(rs.content, "url"):
+            if loc is None:
                 continue
-            u = loc.get_text(strip=True)
-            lm_dt: Optional[datetime] = None
-            if lastmod and lastmod.get_text(strip=True):
-                try:
-                    lm_dt = datetime.fromisoformat(lastmod.get_text(strip=True).replace("Z", "+00:00"))
-                except Exception:
-                    lm_dt = None
-            yield u, lm_dt
+            yield loc.strip(), _parse_lastmod(lastmod)
 
 
 def fetch_web_for_issue_week(http: HttpClient, cfg: Settings, issue: Issue) -> List[Article]:
@@ -177,41 +296,50 @@ def fetch_web_for_issue_week(http: HttpClient, cfg: Settings, issue: Issue) -> L
     end = issue.date + timedelta(days=cfg.week_radius_days)
 
     results: List[Article] = []
-    seen: Set[str] = set()
 
+    # Filter the whole sitemap first (cheapest tests first), then fetch the
+    # survivors as one batch so _fetch_many can overlap them.
+    candidates: List[str] = []
+    seen: Set[str] = set()
+    # day window as proleptic ordinals: one int compare per URL, no date objects
+    start_ord, end_ord = start.toordinal(), end.toordinal()
     for url, lastmod in _iter_sitemap_urls(http, cfg):
+        if lastmod is None:
+            continue
+        if not start_ord <= lastmod.toordinal() <= end_ord:
+            continue
         if not url.startswith(cfg.base_url):
             continue
         # web-only: exclude magazine namespace
         if "/magazine/" in url:
             continue
-        if lastmod is None:
-            continue
-        if lastmod.date() < start.date() or lastmod.date() > end.date():
-            continue
         if url in seen:
             continue
         seen.add(url)
-
-        rr = http.get(url)
-        html = rr.text
-        text, meta = extract_article_text(html)
-        if not text or len(text.split()) < 50:
+        candidates.append(url)
+
+    if not candidates:
+        return results
+    # raw pages go under the issue year; extracted JSON under the published
+    # year, which is the issue year for most of the window
+    year = issue.date.year
+    year_dirs = _year_dirs(cfg, "web", year)
+    raw_year_dir = year_dirs[0]
+    for d in year_dirs:
+        os.makedirs(d, exist_ok=True)
+
+    for url, rr in _fetch_many(http, cfg, candidates):
+        html: Union[str, bytes] = rr.content
+        text, meta = extract_article_text(html, cfg.html_parser)
+        if not _has_min_words(text, 50):
             try:
                 html = http.get_rendered(url)
-                text, meta = extract_article_text(html)
+                text, meta = extract_article_text(html, cfg.html_parser)
             except Exception:
                 pass
         # Save raw html
-        year = issue.date.year
         slug = slugify(meta.get("title") or url)
-        raw_path = os.path.join(cfg.raw_dir, "web", f"year={year}", safe_filename(f"{slug}.html"))
-        ensure_parent_dir(raw_path)
-        try:
-            with open(raw_path, "w", encoding="utf-8") as f:
-                f.write(html)
-        except Exception:
-            pass
+        _write_raw_html(os.path.join(raw_year_dir, safe_filename(f"{slug}.html")), html)
 
         pub_date: Optional[datetime] = None
         if meta.get("date"):
@@ -230,7 +358,8 @@ def fetch_web_for_issue_week(http: HttpClient, cfg: Settings, issue: Issue) -> L
             source="web",
             text=text or "",
         )
-        _save_raw_and_extracted(art, cfg)
+        same_year = pub_date is None or pub_date.year == year
+        _save_raw_and_extracted(art, cfg, year_dirs if same_year else None)
         results.append(art)
 
     return results
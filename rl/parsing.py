@@ -1,87 +1,276 @@
 from __future__ import annotations
 
-import re
-from typing import Dict, List, Optional, Tuple
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
+# Optional dependency
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except Exception:  # pragma: no cover
+    LexborHTMLParser = None
 
+# comments stay in the tree: itertext() skips them, and removing them would
+# glue together the text on either side (React emits <!-- --> between words)
+_PARSER = etree.HTMLParser(remove_pis=True)
+
+
+def _has_class(name: str) -> str:
+    # XPath equivalent of the CSS ".name" class test
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# CSS selectors, compiled to XPath once at import ("(...)[1]" = select_one)
 _BODY_SELECTORS = [
-    "article",
-    "main",
-    "div.article__body",
-    "div.ArticleBody__content",
-    "section.article-body",
-    "div.Body__inner-container",
-    "div.body__inner-container",
+    ("article", etree.XPath("(//article)[1]")),
+    ("main", etree.XPath("(//main)[1]")),
+    ("div.article__body", etree.XPath(f"(//div[{_has_class('article__body')}])[1]")),
+    ("div.ArticleBody__content", etree.XPath(f"(//div[{_has_class('ArticleBody__content')}])[1]")),
+    ("section.article-body", etree.XPath(f"(//section[{_has_class('article-body')}])[1]")),
+    ("div.Body__inner-container", etree.XPath(f"(//div[{_has_class('Body__inner-container')}])[1]")),
+    ("div.body__inner-container", etree.XPath(f"(//div[{_has_class('body__inner-container')}])[1]")),
 ]
+# in priority order; the lxml path matches the same elements in _extract_meta_from_root
+_AUTHOR_SELECTORS = [
+    "meta[name='author']",
+    "a.byline__name",
+    "span.byline__name",
+    "a[rel='author']",
+]
+_XP_PARAS = etree.XPath("./descendant::p")
+# nav.breadcrumbs a:last-of-type, relative to the nav
+_XP_LAST_LINK = etree.XPath("(.//a[not(following-sibling::a)])[1]")
+_XP_BODY = etree.XPath("(//body)[1]")
+_CSS_BREADCRUMB = "nav.breadcrumbs a:last-of-type"
+
+
+def _parse(html: Union[str, bytes]) -> etree._Element:
+    if isinstance(html, bytes):
+        # pages are UTF-8; anything else is left to libxml2's charset detection
+        try:
+            html = html.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+    try:
+        root = etree.fromstring(html, _PARSER)
+    except ValueError:
+        # str input with an <?xml encoding=...?> declaration
+        root = etree.fromstring(html.encode("utf-8"), _PARSER)
+    # empty documents parse to None
+    if root is None:
+        return etree.fromstring("<html></html>", _PARSER)
+    # get_text() never returned script/style/template contents; keep the text after them
+    etree.strip_elements(root, "script", "style", "template", with_tail=False)
+    return root
 
 
-def _collect_paragraphs(el) -> List[str]:
-    paras: List[str] = []
-    for p in el.select("p"):
-        txt = p.get_text(" ", strip=True)
+def _text(el: etree._Element, sep: str = "") -> str:
+    # same joining rules as BeautifulSoup's get_text(sep, strip=True)
+    return sep.join(s for s in (t.strip() for t in el.itertext()) if s)
+
+
+def _first(xpath: etree.XPath, root: etree._Element) -> Optional[etree._Element]:
+    found = xpath(root)
+    return found[0] if found else None
+
+
+def _iter_paragraphs(el: etree._Element) -> Iterator[str]:
+    for p in _XP_PARAS(el):
+        txt = _text(p, " ")
         if txt and len(txt) > 1:
-            paras.append(txt)
-    return paras
+            yield txt
 
 
-def extract_meta(html: str) -> Dict[str, Optional[str]]:
-    soup = BeautifulSoup(html, "lxml")
+def _extract_meta_from_root(root: etree._Element) -> Dict[str, Optional[str]]:
     meta: Dict[str, Optional[str]] = {
         "title": None,
         "author": None,
         "date": None,
         "section": None,
     }
+    # One walk records the first match of every selector instead of searching
+    # the tree once per field; stops early once the meta tags answer everything.
+    title: Optional[etree._Element] = None
+    og_title: Optional[str] = None
+    pub: Optional[str] = None
+    section: Optional[str] = None
+    # first match of each _AUTHOR_SELECTORS entry, same order
+    authors: List[Optional[etree._Element]] = [None] * len(_AUTHOR_SELECTORS)
+    breadcrumb_navs: List[etree._Element] = []
+    for el in root.iter("title", "meta", "a", "span", "nav"):
+        tag = el.tag
+        if tag == "meta":
+            prop = el.get("property")
+            if prop == "og:title":
+                if og_title is None:
+                    og_title = el.get("content") or ""
+            elif prop == "article:published_time":
+                if pub is None:
+                    pub = el.get("content") or ""
+            elif prop == "article:section":
+                if section is None:
+                    section = el.get("content") or ""
+            if authors[0] is None and el.get("name") == "author":
+                authors[0] = el
+            # the top-priority author and every meta field are known; nothing left can change
+            if section and None not in (title, og_title, pub, authors[0]) and authors[0].get("content"):
+                break
+        elif tag == "title":
+            if title is None:
+                title = el
+        elif tag == "nav":
+            if "breadcrumbs" in (el.get("class") or "").split():
+                breadcrumb_navs.append(el)
+        else:
+            if "byline__name" in (el.get("class") or "").split():
+                i = 1 if tag == "a" else 2
+                if authors[i] is None:
+                    authors[i] = el
+            if tag == "a" and authors[3] is None and el.get("rel") == "author":
+                authors[3] = el
     # Title
-    if soup.title and soup.title.string:
-        meta["title"] = soup.title.string.strip()
-    og_title = soup.find("meta", attrs={"property": "og:title"})
-    if og_title and og_title.get("content"):
-        meta["title"] = og_title.get("content").strip()
+    if title is not None and len(title) == 0 and title.text:
+        meta["title"] = title.text.strip()
+    if og_title:
+        meta["title"] = og_title.strip()
     # Author
-    for sel in [
-        "meta[name='author']",
-        "a.byline__name",
-        "span.byline__name",
-        "a[rel='author']",
-    ]:
-        tag = soup.select_one(sel)
-        if tag:
-            content = tag.get("content") if tag.name == "meta" else tag.get_text(strip=True)
+    for tag in authors:
+        if tag is not None:
+            content = tag.get("content") if tag.tag == "meta" else _text(tag)
             if content:
                 meta["author"] = content
                 break
     # Date
-    date_tag = soup.find("meta", attrs={"property": "article:published_time"})
-    if date_tag and date_tag.get("content"):
-        meta["date"] = date_tag.get("content")
+    meta["date"] = pub or None
     # Section
-    sec = soup.find("meta", attrs={"property": "article:section"})
-    if sec and sec.get("content"):
-        meta["section"] = sec.get("content")
+    meta["section"] = section or None
     if not meta["section"]:
         # try breadcrumbs
-        bc = soup.select_one("nav.breadcrumbs a:last-of-type")
-        if bc:
-            meta["section"] = bc.get_text(strip=True)
+        for nav in breadcrumb_navs:
+            bc = _first(_XP_LAST_LINK, nav)
+            if bc is not None:
+                meta["section"] = _text(bc)
+                break
     return meta
 
 
-def extract_article_text(html: str) -> Tuple[str, Dict[str, Optional[str]]]:
-    soup = BeautifulSoup(html, "lxml")
-    meta = extract_meta(html)
+# values of Settings.html_parser
+HTML_PARSERS = ("auto", "lxml")
+
+
+def _lb_parse(html: Union[str, bytes], parser: str = "auto"):
+    # None means "use lxml": asked for explicitly, lexbor is not installed, or
+    # the bytes are not UTF-8 and need libxml2's charset detection
+    if parser not in HTML_PARSERS:
+        raise ValueError(f"unknown html parser: {parser!r} (expected one of {HTML_PARSERS})")
+    if parser == "lxml" or LexborHTMLParser is None:
+        return None
+    if isinstance(html, bytes):
+        try:
+            html = html.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    tree = LexborHTMLParser(html)
+    # same elements _parse drops; their text is not article text
+    tree.strip_tags(["script", "style", "template"])
+    return tree
+
+
+def _lb_text(node, sep: str = "") -> str:
+    # same joining rules as _text; lexbor keeps empty text nodes, so split them out
+    return sep.join(filter(None, node.text(separator="\0", strip=True).split("\0")))
+
+
+def _lb_iter_paragraphs(node) -> Iterator[str]:
+    for p in node.css("p"):
+        txt = _lb_text(p, " ")
+        if txt and len(txt) > 1:
+            yield txt
+
+
+def _lb_extract_meta(tree) -> Dict[str, Optional[str]]:
+    meta: Dict[str, Optional[str]] = {
+        "title": None,
+        "author": None,
+        "date": None,
+        "section": None,
+    }
+    # Title
+    title = tree.css_first("title")
+    if title is not None:
+        txt = title.text()
+        if txt:
+            meta["title"] = txt.strip()
+    og_title = tree.css_first("meta[property='og:title']")
+    if og_title is not None and og_title.attributes.get("content"):
+        meta["title"] = og_title.attributes["content"].strip()
+    # Author
+    for css in _AUTHOR_SELECTORS:
+        tag = tree.css_first(css)
+        if tag is not None:
+            content = tag.attributes.get("content") if tag.tag == "meta" else _lb_text(tag)
+            if content:
+                meta["author"] = content
+                break
+    # Date
+    pub = tree.css_first("meta[property='article:published_time']")
+    meta["date"] = (pub.attributes.get("content") if pub is not None else None) or None
+    # Section
+    section = tree.css_first("meta[property='article:section']")
+    meta["section"] = (section.attributes.get("content") if section is not None else None) or None
+    if not meta["section"]:
+        # try breadcrumbs
+        bc = tree.css_first(_CSS_BREADCRUMB)
+        if bc is not None:
+            meta["section"] = _lb_text(bc)
+    return meta
+
+
+def _lb_extract_article_text(tree) -> Tuple[str, Dict[str, Optional[str]]]:
+    meta = _lb_extract_meta(tree)
+
+    # Prefer a clear article container
+    for css, _ in _BODY_SELECTORS:
+        container = tree.css_first(css)
+        if container is not None:
+            paras = _lb_iter_paragraphs(container)
+            head = list(islice(paras, 2))
+            if len(head) >= 2:
+                return ("\n\n".join(chain(head, paras)), meta)
+
+    # Fallback: all <p> under body
+    body = tree.body
+    return ("\n\n".join(_lb_iter_paragraphs(body if body is not None else tree.root)), meta)
+
+
+def extract_meta(html: Union[str, bytes], parser: str = "auto") -> Dict[str, Optional[str]]:
+    tree = _lb_parse(html, parser)
+    if tree is not None:
+        return _lb_extract_meta(tree)
+    return _extract_meta_from_root(_parse(html))
+
+
+def extract_article_text(html: Union[str, bytes], parser: str = "auto") -> Tuple[str, Dict[str, Optional[str]]]:
+    # parser="auto": lexbor (selectolax) when available, lxml otherwise
+    tree = _lb_parse(html, parser)
+    if tree is not None:
+        return _lb_extract_article_text(tree)
+
+    # one parse serves both the metadata and the body
+    root = _parse(html)
+    meta = _extract_meta_from_root(root)
 
     # Prefer a clear article container
-    for sel in _BODY_SELECTORS:
-        container = soup.select_one(sel)
-        if container:
-            paras = _collect_paragraphs(container)
-            if len(paras) >= 2:
-                return ("\n\n".join(paras), meta)
+    for _, xpath in _BODY_SELECTORS:
+        container = _first(xpath, root)
+        if container is not None:
+            paras = _iter_paragraphs(container)
+            # only the first two paragraphs are needed to accept the container
+            head = list(islice(paras, 2))
+            if len(head) >= 2:
+                return ("\n\n".join(chain(head, paras)), meta)
 
     # Fallback: all <p> under body
-    body = soup.body or soup
-    paras = _collect_paragraphs(body)
-    return ("\n\n".join(paras), meta)
+    body = _first(_XP_BODY, root)
+    return ("\n\n".join(_iter_paragraphs(body if body is not None else root)), meta)
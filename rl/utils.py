@@ -2,43 +2,77 @@ from __future__ import annotations
 
 import csv
 import hashlib
+import io
 import os
 import re
 import time
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Set
 
 
-_slugify_re = re.compile(r"[^a-z0-9\-]+")
-_whitespace_re = re.compile(r"\s+")
+# one pass turns whitespace, punctuation and hyphen runs into a single "-"
+_slugify_re = re.compile(r"[^a-z0-9]+")
+_SAFE_FN_RE = re.compile(r"[^a-zA-Z0-9._\-/]")
 
 
 def sha1_hex(text: str) -> str:
     return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
 
+def hash_digest(text: str) -> bytes:
+    # Cache-key hash: SHA-256 (SHA-NI accelerated through OpenSSL), truncated to 128 bits.
+    return hashlib.sha256(text.encode("utf-8")).digest()[:16]
+
+
+def hash_hex(text: str) -> str:
+    return hash_digest(text).hex()
+
+
+@lru_cache(maxsize=4096)
 def slugify(text: str, max_len: int = 80) -> str:
-    text = text.strip().lower()
-    text = _whitespace_re.sub("-", text)
-    text = _slugify_re.sub("-", text)
-    text = text.strip("-")
+    text = _slugify_re.sub("-", text.lower()).strip("-")
     if len(text) > max_len:
         text = text[:max_len].rstrip("-")
     return text or "untitled"
 
 
+@lru_cache(maxsize=4096)
 def safe_filename(path: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9._\-/]", "_", path)
+    return _SAFE_FN_RE.sub("_", path)
+
+
+# directories already created by ensure_parent_dir in this process
+_ensured: Set[str] = set()
 
 
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(path)
-    if parent:
+    if parent and parent not in _ensured:
         os.makedirs(parent, exist_ok=True)
+        _ensured.add(parent)
+
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d %H:%M:%S")
+# the zero-padded spellings of _DATE_FORMATS: ISO ones go to fromisoformat, slashed ones are built directly
+_DATE_RE = re.compile(
+    r"(?P<iso>\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:Z|[+-]\d{2}:?\d{2})?)?)"
+    r"|(\d{4})/(\d{2})/(\d{2})(?: (\d{2}):(\d{2}):(\d{2}))?",
+    re.ASCII,
+)
 
 
 def parse_date(s: str) -> Optional[datetime]:
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d %H:%M:%S"):
+    m = _DATE_RE.fullmatch(s)
+    if m is not None:
+        try:
+            if m["iso"]:
+                return datetime.fromisoformat(s)
+            return datetime(*(int(g) for g in m.groups()[1:] if g is not None))
+        except ValueError:
+            pass
+    # strptime also takes unpadded fields ("2024-1-5"); out-of-range values fail here too
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(s, fmt)
         except Exception:
@@ -55,10 +89,12 @@ def sleep_polite(seconds: float) -> None:
         time.sleep(seconds)
 
 
-def write_csv(path: str, rows: Iterable[Dict[str, object]], fieldnames: List[str]) -> None:
+def write_csv_rows(path: str, rows: Iterable[Sequence[object]], fieldnames: List[str]) -> None:
+    # rows already in `fieldnames` order; formatted in memory, then one write
+    buf = io.StringIO(newline="")
+    w = csv.writer(buf)
+    w.writerow(fieldnames)
+    w.writerows(rows)
     ensure_parent_dir(path)
     with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for row in rows:
-            w.writerow(row)
+        f.write(buf.getvalue())
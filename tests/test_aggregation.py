@@ -0,0 +1,184 @@
+import csv
+import json
+import math
+import os
+
+from rl import aggregation, metrics_cache
+from rl.aggregation import (
+    _row_from_csv,
+    aggregate_per_issue,
+    aggregate_per_year,
+    compute_per_article,
+)
+from rl.config import Settings
+
+
+def _make_cfg(tmp_path):
+    return Settings(
+        data_dir=str(tmp_path / "data"),
+        cache_dir=str(tmp_path / "data" / "cache" / "http_v2"),
+        raw_dir=str(tmp_path / "data" / "raw"),
+        extracted_dir=str(tmp_path / "data" / "extracted"),
+        metrics_dir=str(tmp_path / "data" / "metrics"),
+        logs_dir=str(tmp_path / "data" / "logs"),
+        metrics_cache_path=str(tmp_path / "data" / "cache" / "metrics.sqlite"),
+    )
+
+
+def _write_article(cfg, source, name, **fields):
+    d = os.path.join(cfg.extracted_dir, source, "year=2024")
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(fields, f)
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [_row_from_csv(d) for d in csv.DictReader(f)]
+
+
+def test_compute_per_article_parallel_matches_serial(tmp_path, monkeypatch):
+    cfg = _make_cfg(tmp_path)
+    for i in range(10):
+        _write_article(
+            cfg, "magazine" if i % 2 else "web", f"a{i}",
+            url=f"https://example.com/{i}", issue_date="2024-01-01",
+            text="The cat sat on the mat. " * (i + 1),
+        )
+    monkeypatch.setattr(aggregation, "_CHUNK_SIZE", 3)
+    serial = _read_rows(compute_per_article(cfg, jobs=1))
+    parallel = _read_rows(compute_per_article(cfg, jobs=2, force=True))
+    assert len(serial) == 10
+    assert sorted(serial, key=lambda r: r.url) == sorted(parallel, key=lambda r: r.url)
+
+
+def test_aggregate_per_issue_reads_per_article_csv(tmp_path):
+    cfg = _make_cfg(tmp_path)
+    _write_article(cfg, "magazine", "short", url="https://example.com/a", issue_date="2024-01-01",
+                   text="The cat sat on the mat.")
+    _write_article(cfg, "magazine", "long", url="https://example.com/b", issue_date="2024-01-01",
+                   text="An extraordinary, unbelievable circumstance. " * 5)
+    _write_article(cfg, "web", "undated", url="https://example.com/c", text="No date here at all.")
+    per_article = compute_per_article(cfg)
+    rows = _read_rows(per_article)
+    mag = [r for r in rows if r.source == "magazine"]
+
+    with open(aggregate_per_issue(cfg, per_article), newline="", encoding="utf-8") as f:
+        out = list(csv.DictReader(f))
+    assert len(out) == 1
+    assert out[0]["issue_date"] == "2024-01-01"
+    assert int(out[0]["num_articles"]) == 2
+    assert int(out[0]["total_words"]) == sum(r.num_words for r in mag)
+    expected = sum(r.gunning_fog * r.num_words for r in mag) / sum(r.num_words for r in mag)
+    assert math.isclose(float(out[0]["gunning_fog_weighted_mean"]), expected)
+
+
+def test_aggregate_per_year_groups_by_year(tmp_path):
+    cfg = _make_cfg(tmp_path)
+    per_issue = tmp_path / "per_issue.csv"
+    header = "issue_date,source,gunning_fog_mean,dale_chall_mean,flesch_reading_ease_mean\n"
+    per_issue.write_text(header + "2023-12-31,magazine,10,6,50\n2024-01-01,magazine,8,5,60\n2024-06-01,magazine,12,7,40\n")
+    with open(aggregate_per_year(cfg, str(per_issue)), newline="", encoding="utf-8") as f:
+        out = list(csv.DictReader(f))
+    assert [(r["year"], float(r["gunning_fog_mean"])) for r in out] == [("2023", 10.0), ("2024", 10.0)]
+
+    per_issue.write_text(header)
+    with open(aggregate_per_year(cfg, str(per_issue)), newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == []
+
+
+def test_metrics_cache_reuses_and_force_recomputes(tmp_path, monkeypatch):
+    cfg = _make_cfg(tmp_path)
+    _write_article(cfg, "magazine", "a", url="https://example.com/a", issue_date="2024-01-01",
+                   text="The cat sat on the mat.")
+    first = _read_rows(compute_per_article(cfg))
+
+    calls = []
+    real_batch = metrics_cache.readability_metrics_batch
+    monkeypatch.setattr(metrics_cache, "readability_metrics_batch", lambda texts: calls.append(texts) or real_batch(texts))
+    # a touched file is re-read, but its unchanged text is served from the metrics cache
+    os.utime(os.path.join(cfg.extracted_dir, "magazine", "year=2024", "a.json"), ns=(1_000_000_000, 1_000_000_000))
+    assert _read_rows(compute_per_article(cfg)) == first
+    assert calls == []
+    assert _read_rows(compute_per_article(cfg, force=True)) == first
+    assert len(calls) == 1
+
+
+def test_compute_per_article_skips_unchanged_files(tmp_path, monkeypatch):
+    cfg = _make_cfg(tmp_path)
+    for i in range(3):
+        _write_article(cfg, "magazine", f"a{i}", url=f"https://example.com/{i}", issue_date="2024-01-01",
+                       title=f"T{i}", text="The cat sat on the mat. " * (i + 1))
+    out = compute_per_article(cfg)
+    with open(out, encoding="utf-8") as f:
+        first = f.read()
+
+    seen = []
+    real = aggregation._compute_rows
+    monkeypatch.setattr(aggregation, "_compute_rows", lambda items, **kw: seen.extend(items) or real(items, **kw))
+    compute_per_article(cfg)
+    assert seen == []
+    with open(out, encoding="utf-8") as f:
+        assert f.read() == first
+
+    _write_article(cfg, "magazine", "a1", url="https://example.com/1", issue_date="2024-01-01",
+                   title="T1", text="An extraordinary, unbelievable circumstance. " * 4)
+    compute_per_article(cfg)
+    assert [os.path.basename(p) for _, p in seen] == ["a1.json"]
+    incremental = sorted(_read_rows(out), key=lambda r: r.url)
+    assert incremental == sorted(_read_rows(compute_per_article(cfg, force=True)), key=lambda r: r.url)
+
+
+def test_compute_per_article_keeps_newest_copy_of_a_url(tmp_path):
+    cfg = _make_cfg(tmp_path)
+    _write_article(cfg, "magazine", "talk-of-the-town--foo", url="https://example.com/foo", issue_date="2024-01-01",
+                   title="Old", text="The cat sat on the mat.")
+    old_path = os.path.join(cfg.extracted_dir, "magazine", "year=2024", "talk-of-the-town--foo.json")
+    os.utime(old_path, ns=(1_000_000_000, 1_000_000_000))
+    _write_article(cfg, "magazine", "talk-of-the-town-foo", url="https://example.com/foo", issue_date="2024-01-01",
+                   title="New", text="The cat sat on the mat.")
+    _write_article(cfg, "web", "foo", url="https://example.com/foo", issue_date="2024-01-01",
+                   title="Web", text="The cat sat on the mat.")
+    for _ in range(2):  # second run reuses the index
+        out = compute_per_article(cfg)
+        with open(out, newline="", encoding="utf-8") as f:
+            assert sorted((r["source"], r["title"]) for r in csv.DictReader(f)) == [("magazine", "New"), ("web", "Web")]
+
+
+def test_compute_per_article_rescores_older_copy_after_newest_is_deleted(tmp_path):
+    cfg = _make_cfg(tmp_path)
+    _write_article(cfg, "magazine", "old", url="https://example.com/foo", issue_date="2024-01-01",
+                   title="Old", text="The cat sat.")
+    os.utime(os.path.join(cfg.extracted_dir, "magazine", "year=2024", "old.json"), ns=(1_000_000_000, 1_000_000_000))
+    _write_article(cfg, "magazine", "new", url="https://example.com/foo", issue_date="2024-01-01",
+                   title="New", text="The cat sat on the mat today.")
+    compute_per_article(cfg)
+    os.remove(os.path.join(cfg.extracted_dir, "magazine", "year=2024", "new.json"))
+    out = compute_per_article(cfg)
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["title"], r["num_words"]) for r in rows] == [("Old", "3")]
+
+
+def test_compute_per_article_ignores_malformed_index(tmp_path):
+    cfg = _make_cfg(tmp_path)
+    _write_article(cfg, "magazine", "a", url="https://example.com/a", issue_date="2024-01-01",
+                   title="A", text="The cat sat.")
+    out = compute_per_article(cfg)
+    index_path = os.path.join(cfg.metrics_dir, ".index.json")
+    with open(index_path, encoding="utf-8") as f:
+        good = json.load(f)
+    path = next(iter(good["files"]))
+    bad_indexes = [
+        [],
+        {"metrics_version": good["metrics_version"], "files": []},
+        {"metrics_version": good["metrics_version"], "files": {path: 5}},
+        {"metrics_version": good["metrics_version"], "files": {path: [1, 2]}},
+        {"metrics_version": good["metrics_version"], "files": {path: [1, 2, ["magazine"], "u"]}},
+    ]
+    for bad in bad_indexes:
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(bad, f)
+        compute_per_article(cfg)
+        with open(out, newline="", encoding="utf-8") as f:
+            assert [r["title"] for r in csv.DictReader(f)] == ["A"]
@@ -1,9 +1,16 @@
+import http.server
 import os
+import sys
+import threading
+import time
+import types
 from types import SimpleNamespace
 
+import pytest
+
 from rl.cache import SimpleCache
 from rl.config import Settings
-from rl.http import HttpClient
+from rl.http import CachedResponse, HttpClient
 
 
 def test_simple_cache_roundtrip(tmp_path):
@@ -15,15 +22,15 @@ def test_simple_cache_roundtrip(tmp_path):
     cache.set(key, val)
     got = cache.get(key)
     assert got == val
-    # ensure sharded directory exists
-    subdirs = list((tmp_path / "cache").iterdir())
-    assert len(subdirs) == 1
+    # ensure a single database file and no per-key shard directories
+    assert (cache_dir / SimpleCache.DB_NAME).exists()
+    assert not any(p.is_dir() for p in cache_dir.iterdir())
 
 
 def test_httpclient_loads_cookies(tmp_path):
     cfg = Settings(
         data_dir=str(tmp_path / "data"),
-        cache_dir=str(tmp_path / "data" / "cache" / "http"),
+        cache_dir=str(tmp_path / "data" / "cache" / "http_v2"),
         raw_dir=str(tmp_path / "data" / "raw"),
         extracted_dir=str(tmp_path / "data" / "extracted"),
         metrics_dir=str(tmp_path / "data" / "metrics"),
@@ -35,3 +42,186 @@ def test_httpclient_loads_cookies(tmp_path):
     http = HttpClient(cfg, cookies=cookies)
     cookie_names = {c.name for c in http.session.cookies}
     assert "CN_token_access" in cookie_names
+
+
+def test_httpclient_cache_hit_returns_cached_response(tmp_path):
+    http = HttpClient(Settings(cache_dir=str(tmp_path / "cache")))
+    http.cache.set("https://example.com/hit", b"<html></html>")
+    r = http.get("https://example.com/hit")
+    assert r == CachedResponse(b"<html></html>", "https://example.com/hit", True)
+
+
+def test_httpclient_revalidates_stale_entries_with_conditional_get(tmp_path):
+    seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b"sitemap"
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_port}/index.xml"
+    client = HttpClient(Settings(cache_dir=str(tmp_path / "cache"), request_delay_s=0.0))
+    try:
+        assert client.get(url) == CachedResponse(b"sitemap", url, False)
+        # fresh enough: no request at all
+        assert client.get(url, fresh_since=time.time() - 60).from_cache
+        assert seen == [None]
+        # stale: conditional GET, 304 keeps the cached body
+        assert client.get(url, fresh_since=time.time() + 60) == CachedResponse(b"sitemap", url, True)
+        assert seen == [None, '"v1"']
+        assert client.cache.get_entry(url).fetched_at > time.time() - 60
+    finally:
+        client.close()
+        srv.shutdown()
+
+
+def _serve_503():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def test_httpclient_serves_stale_entry_when_revalidation_fails(tmp_path):
+    srv = _serve_503()
+    url = f"http://127.0.0.1:{srv.server_port}/index.xml"
+    client = HttpClient(Settings(cache_dir=str(tmp_path / "cache"), request_delay_s=0.0, max_retries=1))
+    try:
+        client.cache.set(url, b"old sitemap", '"v1"')
+        assert client.get(url, fresh_since=time.time() + 60) == CachedResponse(b"old sitemap", url, True)
+        with pytest.raises(RuntimeError):
+            client.get(url + "?uncached")
+    finally:
+        client.close()
+        srv.shutdown()
+
+
+def test_async_client_serves_stale_entry_when_revalidation_fails(tmp_path):
+    pytest.importorskip("httpx")
+    pytest.importorskip("aiolimiter")
+    from rl.http_async import AsyncHttpClient
+
+    srv = _serve_503()
+    url = f"http://127.0.0.1:{srv.server_port}/index.xml"
+    client = AsyncHttpClient(Settings(cache_dir=str(tmp_path / "cache"), request_delay_s=0.0, max_retries=1))
+    try:
+        client.cache.set(url, b"old sitemap", '"v1"')
+        assert client.get(url, fresh_since=time.time() + 60) == CachedResponse(b"old sitemap", url, True)
+    finally:
+        client.close()
+        srv.shutdown()
+
+
+def test_async_client_fetches_concurrently_and_caches(tmp_path):
+    pytest.importorskip("httpx")
+    pytest.importorskip("aiolimiter")
+    from rl.http_async import AsyncHttpClient, map_concurrent
+
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = f"page {self.path}".encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_port}"
+    cfg = Settings(cache_dir=str(tmp_path / "cache"), request_delay_s=0.0)
+    client = AsyncHttpClient(cfg)
+    try:
+        bodies = map_concurrent(lambda i: client.get(f"{base}/{i}").content, range(6), 3)
+        assert bodies == [f"page /{i}".encode() for i in range(6)]
+        assert client.get(f"{base}/2").from_cache
+        assert len(hits) == 6
+    finally:
+        client.close()
+        srv.shutdown()
+
+
+def test_get_rendered_reuses_one_browser(tmp_path, monkeypatch):
+    launches = []
+
+    class FakePage:
+        def goto(self, url, timeout):
+            self.url = url
+
+        def wait_for_load_state(self, state):
+            pass
+
+        def content(self):
+            return f"<html>{self.url}</html>"
+
+        def close(self):
+            pass
+
+    class FakeContext:
+        def add_cookies(self, cookies):
+            pass
+
+        def new_page(self):
+            return FakePage()
+
+        def close(self):
+            pass
+
+    class FakeBrowser:
+        def new_context(self, user_agent):
+            return FakeContext()
+
+        def is_connected(self):
+            return True
+
+        def close(self):
+            pass
+
+    class FakePlaywright:
+        chromium = SimpleNamespace(launch=lambda headless: launches.append(headless) or FakeBrowser())
+
+        def start(self):
+            return self
+
+        def stop(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "playwright", types.ModuleType("playwright"))
+    monkeypatch.setitem(sys.modules, "playwright.sync_api", SimpleNamespace(sync_playwright=FakePlaywright))
+    http = HttpClient(Settings(cache_dir=str(tmp_path / "cache")))
+    try:
+        assert http.get_rendered("https://example.com/a") == "<html>https://example.com/a</html>"
+        t = threading.Thread(target=http.get_rendered, args=("https://example.com/b",))
+        t.start()
+        t.join()
+        assert launches == [True]
+        assert http.cache.get("https://example.com/b#rendered") == b"<html>https://example.com/b</html>"
+    finally:
+        http.close()
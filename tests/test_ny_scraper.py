@@ -1,28 +1,37 @@
 import types
+from datetime import datetime
 
-from rl.ny_scraper import _ISSUE_LINK_RE, _MAG_ARTICLE_RE, get_issue_articles
+from rl import ny_scraper
+from rl.ny_scraper import (
+    Issue,
+    _LINK_RE,
+    _iter_sitemap_urls,
+    fetch_magazine_issue,
+    fetch_web_for_issue_week,
+    get_issue_articles,
+)
 from rl.config import Settings
 
 
 class FakeResponse:
     def __init__(self, text: str) -> None:
-        self.text = text
-        self.status_code = 200
+        self.content = text.encode("utf-8")
 
 
 class FakeHttp:
     def __init__(self, html_by_url):
         self.html_by_url = html_by_url
 
-    def get(self, url: str):
+    def get(self, url: str, fresh_since=None):
         return FakeResponse(self.html_by_url.get(url, ""))
 
 
 def test_regex_patterns_match_expected_urls():
-    assert _ISSUE_LINK_RE.match("/magazine/2024/01/01")
-    assert _ISSUE_LINK_RE.match("/magazine/2024/12/31/")
-    assert _MAG_ARTICLE_RE.match("/magazine/2024/01/01/an-article-slug")
-    assert _MAG_ARTICLE_RE.match("/magazine/2024/01/01/an-article-slug/")
+    assert _LINK_RE.fullmatch("/magazine/2024/01/01")["slug"] is None
+    assert _LINK_RE.fullmatch("/magazine/2024/12/31/")["slug"] is None
+    assert _LINK_RE.fullmatch("/magazine/2024/01/01/an-article-slug")["slug"] == "an-article-slug"
+    assert _LINK_RE.fullmatch("/magazine/2024/01/01/an-article-slug/")["slug"] == "an-article-slug"
+    assert _LINK_RE.fullmatch("/magazine/2024/01/01/a/b") is None
 
 
 def test_get_issue_articles_parses_links():
@@ -40,3 +49,74 @@ def test_get_issue_articles_parses_links():
     assert any(u.endswith("/magazine/2024/01/01/an-article-slug") for u in urls)
     assert any(u.endswith("/magazine/2024/01/01/another-article") for u in urls)
     assert all("/news/" not in u for u in urls)
+
+
+def test_fetch_magazine_issue_keeps_article_order_when_pooled(tmp_path, monkeypatch):
+    cfg = Settings(raw_dir=str(tmp_path / "raw"), extracted_dir=str(tmp_path / "extracted"))
+    issue = Issue(date=datetime(2024, 1, 1), url=f"{cfg.base_url}/magazine/2024/01/01")
+    slugs = [f"article-{i}" for i in range(8)]
+    pages = {issue.url: "".join(f'<a href="/magazine/2024/01/01/{s}">x</a>' for s in slugs)}
+    for s in slugs:
+        body = "".join(f"<p>{s} paragraph {j} " + "word " * 30 + "</p>" for j in range(2))
+        pages[f"{cfg.base_url}/magazine/2024/01/01/{s}"] = f"<html><head><title>{s}</title></head><body><article>{body}</article></body></html>"
+
+    sequential = [a.title for a in fetch_magazine_issue(FakeHttp(pages), cfg, issue)]
+    # any client type that _fetch_many treats as safe to call from several threads
+    monkeypatch.setattr(ny_scraper, "AsyncHttpClient", FakeHttp)
+    pooled = [a.title for a in fetch_magazine_issue(FakeHttp(pages), cfg, issue)]
+    assert sequential == pooled == sorted(slugs)
+
+
+class FailingHttp(FakeHttp):
+    def get(self, url: str, fresh_since=None):
+        if url.endswith("broken.xml"):
+            raise IOError("boom")
+        return super().get(url)
+
+
+def test_iter_sitemap_urls_streams_entries(monkeypatch):
+    cfg = Settings()
+    ns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+    index = (
+        f"<sitemapindex {ns}><sitemap><loc>https://x/broken.xml</loc></sitemap>"
+        "<sitemap><loc> https://x/sm1.xml </loc></sitemap></sitemapindex>"
+    )
+    sitemap = (
+        f"<urlset {ns}>"
+        "<url><loc>https://x/a</loc><lastmod>2024-01-02T10:00:00Z</lastmod></url>"
+        "<url><loc>https://x/b</loc></url>"
+        "<url><loc>https://x/c</loc><lastmod>not a date</lastmod></url>"
+        "</urlset>"
+    )
+    http = FailingHttp({f"{cfg.base_url}/sitemaps/newyorker/sitemap-index.xml": index, "https://x/sm1.xml": sitemap})
+    entries = list(_iter_sitemap_urls(http, cfg))
+    assert [u for u, _ in entries] == ["https://x/a", "https://x/b", "https://x/c"]
+    assert entries[0][1] is not None and entries[0][1].date().isoformat() == "2024-01-02"
+    assert entries[1][1] is None and entries[2][1] is None
+
+    # pooled fetching skips the broken sitemap the same way
+    monkeypatch.setattr(ny_scraper, "AsyncHttpClient", FakeHttp)
+    assert list(_iter_sitemap_urls(http, cfg)) == entries
+
+
+def test_fetch_web_for_issue_week_keeps_lastmod_window(tmp_path):
+    cfg = Settings(raw_dir=str(tmp_path / "raw"), extracted_dir=str(tmp_path / "extracted"), week_radius_days=3)
+    issue = Issue(date=datetime(2024, 1, 10), url=f"{cfg.base_url}/magazine/2024/01/10")
+    ns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+    lastmods = {
+        "too-early": "2024-01-06T23:59:59Z",
+        "first-day": "2024-01-07T00:00:00Z",
+        "last-day": "2024-01-13T23:59:59+00:00",
+        "too-late": "2024-01-14T00:00:00Z",
+    }
+    sitemap = f"<urlset {ns}>" + "".join(
+        f"<url><loc>{cfg.base_url}/culture/{slug}</loc><lastmod>{lm}</lastmod></url>" for slug, lm in lastmods.items()
+    ) + f"<url><loc>{cfg.base_url}/magazine/2024/01/10/x</loc><lastmod>2024-01-10</lastmod></url></urlset>"
+    pages = {
+        f"{cfg.base_url}/sitemaps/newyorker/sitemap-index.xml": f"<sitemapindex {ns}><sitemap><loc>https://x/sm.xml</loc></sitemap></sitemapindex>",
+        "https://x/sm.xml": sitemap,
+    }
+    for slug in lastmods:
+        pages[f"{cfg.base_url}/culture/{slug}"] = f"<html><head><title>{slug}</title></head><body><article><p>{'word ' * 60}</p></article></body></html>"
+    arts = fetch_web_for_issue_week(FakeHttp(pages), cfg, issue)
+    assert [a.title for a in arts] == ["first-day", "last-day"]
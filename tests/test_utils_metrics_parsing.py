@@ -1,16 +1,46 @@
+import math
 import os
+from datetime import datetime, timedelta, timezone
 
-from rl.utils import sha1_hex, slugify
-from rl.metrics import readability_metrics
+import numpy as np
+import pytest
+
+from rl import metrics
+from rl.metrics import (
+    _count_syllables_in_word,
+    _count_syllables_spans,
+    _tokenize_words,
+    readability_metrics,
+    readability_metrics_batch,
+)
 from rl.parsing import extract_article_text, extract_meta
+from rl.utils import hash_hex, parse_date, sha1_hex, slugify, write_csv_rows
 
 
 def test_sha1_hex_and_slugify():
     assert sha1_hex("hello") == "aaf4c61ddcc5e8a2dabede0f3b482cd9aea9434d"
+    assert hash_hex("hello") == "2cf24dba5fb0a30e26e83b2ac5b9e29e"
     assert slugify("Hello, World!") == "hello-world"
     assert slugify("  ") == "untitled"
 
 
+def test_write_csv_rows_quotes_fields(tmp_path):
+    path = tmp_path / "out.csv"
+    write_csv_rows(str(path), [(1, 2), ("x,y", "")], ["a", "b"])
+    assert path.read_bytes() == b'a,b\r\n1,2\r\n"x,y",\r\n'
+
+
+def test_parse_date_formats():
+    assert parse_date("2024-01-02") == datetime(2024, 1, 2)
+    assert parse_date("2024/01/02 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+    assert parse_date("2024-01-02T03:04:05Z") == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert parse_date("2024-01-02T03:04:05+0130").utcoffset() == timedelta(hours=1, minutes=30)
+    # unpadded fields still go through strptime
+    assert parse_date("2024-1-2") == datetime(2024, 1, 2)
+    assert parse_date("2024-02-30") is None
+    assert parse_date("January 2, 2024") is None
+
+
 def test_readability_metrics_basic():
     text = "The cat sat on the mat. It was sunny."
     m = readability_metrics(text)
@@ -22,6 +52,49 @@ def test_readability_metrics_basic():
     assert m["flesch_reading_ease"] is not None
 
 
+def test_readability_metrics_batch_matches_single():
+    texts = ["The cat sat on the mat. It was sunny.", "", "Extraordinary circumstances arose!"]
+    batch = readability_metrics_batch(texts)
+    for i, text in enumerate(texts):
+        single = readability_metrics(text)
+        assert batch["num_words"][i] == single["num_words"]
+        assert batch["num_sentences"][i] == single["num_sentences"]
+        for k in ("gunning_fog", "dale_chall", "flesch_reading_ease"):
+            if single[k] is None:
+                assert math.isnan(batch[k][i])
+            else:
+                assert math.isclose(batch[k][i], single[k])
+
+
+def test_syllable_estimators_agree():
+    words = ["cat", "table", "free", "rhythm", "queue", "beautiful", "it's", "a"]
+    assert [_count_syllables_in_word(w) for w in words] == [1, 2, 1, 1, 1, 3, 1, 1]
+    joined = " ".join(words)
+    spans = np.array(list(_tokenize_words(joined)))
+    buf = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+    syls = _count_syllables_spans(buf, spans[:, 0], spans[:, 1])
+    assert list(syls) == [_count_syllables_in_word(w) for w in words]
+
+
+@pytest.mark.parametrize("text", [
+    "The table's free.  Extraordinary!\nIt rained -- again?",
+    # str.strip() treats NBSP, thin and ideographic spaces as blank too
+    "He paused.\xa0.\xa0. and then he went home.\u2009. It was late.\u3000!",
+])
+def test_byte_scan_matches_regex_path(monkeypatch, text):
+    buf = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    monkeypatch.setattr(metrics, "_scan", None)
+    c = metrics._scan_counters([text])
+    assert metrics._scan_counts(buf) == (c.words[0], c.sentences[0], c.syllables[0], c.complex_[0])
+
+
+def test_difficult_words_use_dale_chall_list():
+    # "the", "cat", "sat" are easy; "extraordinary" and "circumstance" are not
+    c = metrics._scan_counters(["The cat sat. Extraordinary circumstance!"])
+    assert c.words[0] == 5
+    assert c.difficult[0] == 2
+
+
 def test_parsing_extracts_title_and_text():
     html = """
     <html>
@@ -44,3 +117,61 @@ def test_parsing_extracts_title_and_text():
     assert meta["title"] == "Sample Article"
     assert meta["section"] == "Fiction"
     assert meta["date"] == "2024-01-01T00:00:00Z"
+
+
+@pytest.mark.parametrize("parser", ["lxml", "auto"])
+def test_parsing_drops_script_and_style_text(parser):
+    html = """
+    <html><body><article>
+      <p>One <script>var a = 1;</script>two <style>p { color: red; }</style>three.</p>
+      <p>Second paragraph.</p>
+    </article></body></html>
+    """
+    text, _ = extract_article_text(html, parser=parser)
+    assert text == "One two three.\n\nSecond paragraph."
+
+
+@pytest.mark.parametrize("parser", ["lxml", "auto"])
+def test_parsing_keeps_words_split_by_comments(parser):
+    html = "<html><body><main><p>React<!-- -->rendered<!-- c -->text.</p><p>Second paragraph.</p></main></body></html>"
+    text, _ = extract_article_text(html, parser=parser)
+    assert text == "React rendered text.\n\nSecond paragraph."
+
+
+def test_unknown_html_parser_is_rejected():
+    with pytest.raises(ValueError):
+        extract_meta("<html></html>", parser="bs4")
+
+
+def test_lexbor_path_matches_lxml():
+    pytest.importorskip("selectolax")
+    html = """
+    <html>
+      <head><title>Sample</title><meta name="author" content="" /></head>
+      <body>
+        <a class="byline__name" href="#"> A. <b>Writer</b> </a>
+        <nav class="breadcrumbs"><a>Home</a> <span></span> <a>News <b>Desk</b></a><span>x</span></nav>
+        <main><p>One <i>two</i>
+          three.</p><p>x</p><p>Second paragraph.</p><p>   </p></main>
+      </body>
+    </html>
+    """
+    fast = extract_article_text(html)
+    assert fast == extract_article_text(html, parser="lxml")
+    assert fast[1]["author"] == "A.Writer"
+    assert fast[1]["section"] == "NewsDesk"
+
+
+def test_extract_meta_selector_priorities():
+    html = """
+    <html>
+      <head><title>Page</title><meta property="og:title" content="" /><meta name="author" content="" /></head>
+      <body>
+        <a rel="author">Rel Author</a>
+        <span class="byline byline__name">Byline Author</span>
+        <nav class="breadcrumbs"></nav>
+        <nav class="breadcrumbs"><a>Home</a><a>Books</a></nav>
+      </body>
+    </html>
+    """
+    assert extract_meta(html, parser="lxml") == {"title": "Page", "author": "Byline Author", "date": None, "section": "Books"}